@@ -9,10 +9,7 @@ from pathlib import Path
 from typing import Any, Dict
 
 from update_ppt import _flatten_text_payload, update_presentation
-from utils.slide1_charts import generate_slide1_charts
-from utils.slide2_charts import generate_slide2_charts
-from utils.slide3_charts import generate_slide3_charts
-from utils.slide_pizza_charts import generate_pizza_charts
+from utils.chart_pipeline import generate_all_charts
 from utils.xlsx_text_fields import extract_xlsx_to_text_mapping, parse_text_fields_json
 
 
@@ -200,6 +197,11 @@ def main() -> None:
         action="store_true",
         help="Não gera os PNGs (01..07) antes de atualizar o PPT.",
     )
+    parser.add_argument(
+        "--force-charts",
+        action="store_true",
+        help="Regenera todos os PNGs mesmo se o XLSX não mudou desde a última execução.",
+    )
     args = parser.parse_args()
 
     log_file = args.log_file or os.environ.get("PPTDOC_LOG_FILE")
@@ -223,21 +225,13 @@ def main() -> None:
 
     # Gera os gráficos (por slide) antes de atualizar o PPT.
     if not bool(args.skip_charts):
-        logging.info("Gerando PNGs do slide 1 (01..04)...")
-        s1 = generate_slide1_charts(xlsx_path=xlsx_path, output_dir=images_dir)
-        logging.info("OK: slide 1 gerou %d arquivos", len(s1))
-
-        logging.info("Gerando PNGs do slide 2 (05..07)...")
-        s2 = generate_slide2_charts(xlsx_path=xlsx_path, output_dir=images_dir)
-        logging.info("OK: slide 2 gerou %d arquivos", len(s2))
-
-        logging.info("Gerando PNGs do slide 3 (08..09)...")
-        s3 = generate_slide3_charts(xlsx_path=xlsx_path, output_dir=images_dir)
-        logging.info("OK: slide 3 gerou %d arquivos", len(s3))
-
-        logging.info("Gerando PNGs do slide 4 (10..12)...")
-        s4 = generate_pizza_charts(xlsx_path=xlsx_path, output_dir=images_dir)
-        logging.info("OK: slide 4 gerou %d arquivos", len(s4))
+        logging.info("Gerando PNGs dos slides 1..4 (01..12) em paralelo...")
+        generated = generate_all_charts(
+            xlsx_path=xlsx_path,
+            output_dir=images_dir,
+            force=bool(args.force_charts),
+        )
+        logging.info("OK: gerados %d arquivos", len(generated))
 
     text_fields_config = _resolve_path(repo_root, str(cfg.get("text_fields_config", "config/text_fields.json")))
 
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+try:
+    from openpyxl import Workbook
+except Exception:  # pragma: no cover
+    Workbook = None
+
+from utils import chart_pipeline, workbook_cache
+
+
+_CALLS = []
+
+
+def _fake_generator(*, xlsx_path: Path, output_dir: Path, wb=None):
+    _CALLS.append(xlsx_path)
+    out = output_dir / "fake.png"
+    out.write_bytes(b"png")
+    return [out]
+
+
+def _reading_generator(*, xlsx_path: Path, output_dir: Path, wb=None):
+    wb = workbook_cache.load_workbook_cached(xlsx_path)
+    inherited = getattr(wb, "_from_parent", False)
+    rows = list(wb["S"].iter_rows(min_row=1, max_row=200, min_col=1, max_col=3, values_only=True))
+    out = output_dir / f"{os.getpid()}-{inherited}-{len(rows)}-{rows[-1][2]}.png"
+    out.write_bytes(b"png")
+    return [out]
+
+
+class TestChartPipeline(unittest.TestCase):
+    def setUp(self):
+        _CALLS.clear()
+        workbook_cache.clear_workbook_cache()
+        self.addCleanup(workbook_cache.clear_workbook_cache)
+
+    def test_skips_unchanged_slides_until_forced_or_output_missing(self):
+        with tempfile.TemporaryDirectory() as td:
+            xlsx_path = Path(td) / "in.xlsx"
+            xlsx_path.write_bytes(b"x")
+            out_dir = Path(td) / "out"
+
+            def run(**kw):
+                return chart_pipeline.generate_all_charts(xlsx_path=xlsx_path, output_dir=out_dir, max_workers=1, **kw)
+
+            with mock.patch.object(chart_pipeline, "SLIDE_GENERATORS", [_fake_generator]), mock.patch.object(
+                chart_pipeline, "load_workbook_cached"
+            ):
+                self.assertEqual(run(), [out_dir / "fake.png"])
+                self.assertEqual(run(), [out_dir / "fake.png"])
+                self.assertEqual(len(_CALLS), 1)
+
+                run(force=True)
+                self.assertEqual(len(_CALLS), 2)
+
+                (out_dir / "fake.png").unlink()
+                run()
+                self.assertEqual(len(_CALLS), 3)
+
+    @unittest.skipIf(Workbook is None, "openpyxl não instalado")
+    def test_workers_reload_a_workbook_the_parent_already_cached(self):
+        with tempfile.TemporaryDirectory() as td:
+            xlsx_path = Path(td) / "in.xlsx"
+            wb = Workbook()
+            ws = wb.active
+            ws.title = "S"
+            for r in range(1, 201):
+                ws.append([r, f"t{r}", r * 2])
+            wb.save(xlsx_path)
+            out_dir = Path(td) / "out"
+
+            # Open archive in the parent's cache before the workers start.
+            workbook_cache.load_workbook_cached(xlsx_path)._from_parent = True
+            with mock.patch.object(chart_pipeline, "SLIDE_GENERATORS", [_reading_generator] * 8):
+                paths = chart_pipeline.generate_all_charts(
+                    xlsx_path=xlsx_path, output_dir=out_dir, max_workers=4, force=True
+                )
+
+        self.assertEqual(len(paths), 8)
+        self.assertTrue(all(p.name.endswith("-False-200-400.png") for p in paths))
+
+    def test_digest_changes_when_a_shared_module_changes(self):
+        with tempfile.TemporaryDirectory() as td:
+            xlsx_path = Path(td) / "in.xlsx"
+            xlsx_path.write_bytes(b"x")
+            shared = Path(td) / "shared.py"
+            shared.write_text("A = 1\n", encoding="utf-8")
+
+            with mock.patch.object(chart_pipeline, "_SHARED_SOURCES", (str(shared),)):
+                before = chart_pipeline._inputs_digest(_fake_generator, xlsx_path)
+                shared.write_text("A = 22\n", encoding="utf-8")
+                after = chart_pipeline._inputs_digest(_fake_generator, xlsx_path)
+
+        self.assertNotEqual(before, after)
+        self.assertIn(chart_pipeline._mpl_boot.__file__, chart_pipeline._SHARED_SOURCES)
+        self.assertIn(chart_pipeline.workbook_cache.__file__, chart_pipeline._SHARED_SOURCES)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,9 +3,23 @@ import unittest
 import tempfile
 from pathlib import Path
 
-from openpyxl import Workbook
+import numpy as np
+from openpyxl import Workbook, load_workbook
 
-from utils.charts_common import close_figure, plot_line_from_excel, to_float_list
+from utils.charts_common import (
+    _acquire_fig,
+    _fast_range_col,
+    _fast_range_row,
+    _read_range_row,
+    _release_fig,
+    close_figure,
+    make_clean_axes,
+    pchip_build,
+    pchip_eval,
+    pchip_interpolate,
+    plot_line_from_excel,
+    to_float_list,
+)
 
 
 class TestChartsCommon(unittest.TestCase):
@@ -23,6 +37,48 @@ class TestChartsCommon(unittest.TestCase):
         with self.assertRaises(ValueError):
             to_float_list(["N/A"])  # should still error
 
+    def test_read_range_row_pads_rows_past_data_in_read_only_mode(self):
+        wb = Workbook()
+        wb.active["A1"].value = 1
+        wb.active["B1"].value = 2
+
+        with tempfile.TemporaryDirectory() as td:
+            xlsx_path = Path(td) / "t.xlsx"
+            wb.save(xlsx_path)
+            ro = load_workbook(xlsx_path, read_only=True, data_only=True)
+            try:
+                out = _read_range_row(ro.active, "A1:B3")
+            finally:
+                ro.close()
+
+        self.assertEqual(out, [1, 2, None, None, None, None])
+
+    def test_fast_range_row_and_col_match_in_both_worksheet_modes(self):
+        wb = Workbook()
+        wb.active["A1"].value = "x"
+        wb.active["B1"].value = 2
+        wb.active["A2"].value = "y"
+
+        with tempfile.TemporaryDirectory() as td:
+            xlsx_path = Path(td) / "t.xlsx"
+            wb.save(xlsx_path)
+            ro = load_workbook(xlsx_path, read_only=True, data_only=True)
+            try:
+                for ws in (wb.active, ro.active):
+                    self.assertEqual(_fast_range_row(ws, "A1:C4"), ["x", 2, None])
+                    self.assertEqual(_fast_range_col(ws, "A1:C4"), ["x", "y", None, None])
+            finally:
+                ro.close()
+
+    def test_pchip_hits_knots_and_stays_monotone(self):
+        x = np.arange(5, dtype=float)
+        y = np.array([1.0, 2.0, 2.0, 5.0, 9.0])
+        np.testing.assert_allclose(pchip_eval(pchip_build(x, y), x), y)
+
+        xs = np.linspace(0.0, 4.0, 200)
+        ys = pchip_interpolate(x, y, xs)
+        self.assertTrue(np.all(np.diff(ys) >= -1e-12))
+
     def test_plot_line_percent_formatted_cells_scale_to_points(self):
         wb = Workbook()
         ws = wb.active
@@ -59,6 +115,35 @@ class TestChartsCommon(unittest.TestCase):
             finally:
                 close_figure(fig)
 
+    def test_released_figure_is_reused_with_clean_axes(self):
+        fig, ax = _acquire_fig((3, 2))
+        ax.plot([0, 1], [0, 1])
+        _release_fig(fig)
+
+        fig2, ax2 = _acquire_fig((3, 2))
+        try:
+            self.assertIs(fig2, fig)
+            self.assertIs(ax2, ax)
+            self.assertEqual(len(ax2.lines), 0)
+        finally:
+            close_figure(fig2)
+
+    def test_make_clean_axes_pools_per_dpi_and_hides_decorations(self):
+        fig, ax = make_clean_axes((3, 2), dpi=200)
+        ax.spines["bottom"].set_visible(True)
+        _release_fig(fig)
+
+        other, _ = make_clean_axes((3, 2))
+        fig2, ax2 = make_clean_axes((3, 2), dpi=200)
+        try:
+            self.assertIsNot(other, fig)
+            self.assertIs(fig2, fig)
+            self.assertFalse(any(sp.get_visible() for sp in ax2.spines.values()))
+            self.assertEqual(list(ax2.get_xticks()), [])
+        finally:
+            close_figure(other)
+            close_figure(fig2)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,8 @@
+import tempfile
 import unittest
+from pathlib import Path
 
-from utils.json_utils import coerce_json, first_json_object_slice, strip_fences
+from utils.json_utils import coerce_json, first_json_object_slice, first_key, load_json_file, strip_fences
 
 
 class TestJsonUtils(unittest.TestCase):
@@ -20,6 +22,10 @@ class TestJsonUtils(unittest.TestCase):
         s = 'xx {"a": "{not a brace}", "b": 1} yy'
         self.assertEqual(first_json_object_slice(s), '{"a": "{not a brace}", "b": 1}')
 
+    def test_first_json_object_slice_malformed_object_uses_brace_matching(self):
+        s = 'xx {"a": "say \\"}\\"", "b": [1,],} yy'
+        self.assertEqual(first_json_object_slice(s), '{"a": "say \\"}\\"", "b": [1,],}')
+
     def test_coerce_json_parses_plain_json(self):
         self.assertEqual(coerce_json('{"x": 1}'), {"x": 1})
 
@@ -30,6 +36,19 @@ class TestJsonUtils(unittest.TestCase):
         out = coerce_json('some text {"x": 1, "y": 2} more')
         self.assertEqual(out, {"x": 1, "y": 2})
 
+    def test_first_key_returns_first_truthy_alias(self):
+        self.assertEqual(first_key({"id": "", "ID": "X"}, ("id", "ID")), "X")
+        self.assertIsNone(first_key({"sheet": None}, ("sheet", "Sheet")))
+
+    def test_load_json_file_reads_utf8_and_nan(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "cfg.json"
+            path.write_text('{"aba": "Premissas", "x": NaN}', encoding="utf-8")
+            out = load_json_file(path)
+
+        self.assertEqual(out["aba"], "Premissas")
+        self.assertNotEqual(out["x"], out["x"])
+
 
 if __name__ == "__main__":
     unittest.main()
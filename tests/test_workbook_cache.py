@@ -0,0 +1,112 @@
+import gc
+import io
+import os
+import tempfile
+import unittest
+import weakref
+from pathlib import Path
+
+from utils import workbook_cache, xlsx_extract
+
+
+class _Closable:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestWorkbookCache(unittest.TestCase):
+    def setUp(self):
+        workbook_cache.clear_workbook_cache()
+
+    def tearDown(self):
+        workbook_cache.clear_workbook_cache()
+
+    def test_evicts_without_closing_and_clear_closes_cached(self):
+        wbs = [_Closable() for _ in range(workbook_cache._CACHE_SIZE + 1)]
+        for i, wb in enumerate(wbs):
+            self.assertIs(workbook_cache.cached_workbook(("k", i), lambda wb=wb: wb), wb)
+
+        self.assertNotIn(("k", 0), workbook_cache._CACHE)
+        self.assertFalse(any(wb.closed for wb in wbs))
+        workbook_cache.clear_workbook_cache()
+        self.assertEqual([wb.closed for wb in wbs], [False] + [True] * (len(wbs) - 1))
+
+    def test_concurrent_miss_keeps_first_workbook_and_closes_duplicate(self):
+        first, duplicate = _Closable(), _Closable()
+
+        def load_racing():
+            # Simulates another thread finishing its load of the same key first.
+            workbook_cache.cached_workbook(("k",), lambda: first)
+            return duplicate
+
+        self.assertIs(workbook_cache.cached_workbook(("k",), load_racing), first)
+        self.assertTrue(duplicate.closed)
+        self.assertFalse(first.closed)
+
+    def test_edited_file_replaces_stale_workbook_without_closing_it(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "file.xlsx"
+            path.write_bytes(b"one")
+            old = _Closable()
+            key, _source = workbook_cache.source_key(path)
+            workbook_cache.cached_workbook((*key, True), lambda: old)
+
+            path.write_bytes(b"edited")
+            os.utime(path, ns=(1, 1))
+            key, _source = workbook_cache.source_key(path)
+            new = workbook_cache.cached_workbook((*key, True), _Closable)
+
+        self.assertEqual(list(workbook_cache._CACHE.values()), [new])
+        self.assertFalse(old.closed)
+
+    def test_held_workbook_survives_eviction(self):
+        try:
+            from openpyxl import Workbook
+        except Exception:  # pragma: no cover
+            self.skipTest("openpyxl não instalado")
+
+        blobs = []
+        for i in range(workbook_cache._CACHE_SIZE + 2):
+            wb = Workbook()
+            wb.active["A1"] = i
+            buf = io.BytesIO()
+            wb.save(buf)
+            blobs.append(buf.getvalue())
+
+        wb0 = xlsx_extract._load_workbook_cached(filename=blobs[0])
+        for blob in blobs[1:]:
+            xlsx_extract._load_workbook_cached(filename=blob)
+        self.assertEqual(len(workbook_cache._CACHE), workbook_cache._CACHE_SIZE)
+
+        rows = wb0.active.iter_rows(min_row=1, max_row=1, min_col=1, max_col=1, values_only=True)
+        self.assertEqual(list(rows), [(0,)])
+
+        # Once the caller lets go, the evicted workbook and its archive are freed.
+        archive = weakref.ref(wb0._archive)
+        del wb0
+        gc.collect()
+        self.assertIsNone(archive())
+
+    def test_load_workbook_cached_shares_and_closes_chart_workbooks(self):
+        try:
+            from openpyxl import Workbook
+        except Exception:  # pragma: no cover
+            self.skipTest("openpyxl não instalado")
+
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "file.xlsx"
+            Workbook().save(path)
+
+            wb = workbook_cache.load_workbook_cached(path)
+            self.assertIs(workbook_cache.load_workbook_cached(str(path)), wb)
+            self.assertIsNotNone(wb._archive.fp)
+
+            workbook_cache.clear_workbook_cache()
+            self.assertIsNone(wb._archive.fp)
+
+
+if __name__ == "__main__":
+    unittest.main()
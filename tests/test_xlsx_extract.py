@@ -2,10 +2,12 @@ import json
 import tempfile
 import unittest
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
+from utils import workbook_cache, xlsx_extract
 from utils.xlsx_extract import (
     ExtractSpec,
+    extract_workbook_to_dict,
     extract_xlsx_bytes_to_dict,
     extract_xlsx_to_dict,
     parse_specs_args,
@@ -25,6 +27,11 @@ class _FakeWorksheet:
     def cell(self, row: int, column: int):
         return _FakeCell(self._values_by_rowcol.get((row, column)))
 
+    def iter_rows(self, *, min_row, max_row, min_col, max_col, values_only=False):
+        for r in range(min_row, max_row + 1):
+            cells = [self.cell(r, c) for c in range(min_col, max_col + 1)]
+            yield tuple(c.value for c in cells) if values_only else tuple(cells)
+
 
 class _FakeWorkbook:
     def __init__(self, sheets):
@@ -53,6 +60,10 @@ def _fake_workbook() -> _FakeWorkbook:
 
 
 class TestXlsxExtract(unittest.TestCase):
+    def setUp(self):
+        # Loads are cached per path/bytes; keep each test's patched loader isolated.
+        workbook_cache.clear_workbook_cache()
+
     def test_parse_specs_json_accepts_expected_shape(self):
         specs = [
             {
@@ -106,6 +117,48 @@ class TestXlsxExtract(unittest.TestCase):
         parsed = parse_specs_args(["ROE_9M:DRE Saida:L3:M3:L20:M20"], default_sheet=None)
         self.assertEqual(parsed[0].sheet, "DRE Saida")
 
+    def test_col_letters_to_index_lookup_and_long_columns(self):
+        self.assertEqual(xlsx_extract._col_letters_to_index("a"), 1)
+        self.assertEqual(xlsx_extract._col_letters_to_index("ZZ"), 702)
+        self.assertEqual(xlsx_extract._col_letters_to_index("XFD"), 16384)
+        self.assertEqual(xlsx_extract._col_letters_to_index("AAA"), 703)
+        with self.assertRaises(ValueError):
+            xlsx_extract._col_letters_to_index("A1")
+        with self.assertRaises(ValueError):
+            xlsx_extract._col_letters_to_index("ÇAA")
+
+    def test_read_ranges_by_sheet_slices_flat_union_block(self):
+        ws = _FakeWorksheet({(r, c): r * 10 + c for r in range(1, 5) for c in range(1, 4)})
+        blocks = xlsx_extract._read_ranges_by_sheet(
+            _FakeWorkbook({"S": ws}), [("S", "A1:C2"), ("S", "B2:C4"), ("S", "C9")]
+        )
+
+        self.assertEqual(blocks[("S", "A1:C2")], ([11, 12, 13, 21, 22, 23], 2, 3))
+        self.assertEqual(blocks[("S", "B2:C4")], ([22, 23, 32, 33, 42, 43], 3, 2))
+        self.assertEqual(blocks[("S", "C9")], ([None], 1, 1))
+
+    def test_range_boundaries_parses_a1_forms(self):
+        self.assertEqual(xlsx_extract._a1_to_rowcol("$ab$123"), (123, 28))
+        self.assertEqual(xlsx_extract._a1_to_rowcol(" XFD1048576 "), (1048576, 16384))
+        self.assertEqual(xlsx_extract._range_boundaries("L3:M20"), (12, 3, 13, 20))
+        self.assertEqual(xlsx_extract._range_boundaries("$M$20:$L$3"), (12, 3, 13, 20))
+        self.assertEqual(xlsx_extract._range_boundaries("B5"), (2, 5, 2, 5))
+        for bad in ("5B", "B", "$$B5", "Ç5", "B5:"):
+            with self.assertRaises(ValueError):
+                xlsx_extract._range_boundaries(bad)
+
+    def test_coerce_values_large_ranges_match_scalar_path(self):
+        numeric = [1, 2.5, None, " ", "3", True] * 20
+        self.assertEqual(
+            xlsx_extract._coerce_values(numeric, strict=False),
+            [1.0, 2.5, None, None, 3.0, 1.0] * 20,
+        )
+
+        mixed = numeric + ["abc"]
+        self.assertIsNone(xlsx_extract._coerce_values(mixed, strict=False)[-1])
+        with self.assertRaises(ValueError):
+            xlsx_extract._coerce_values(mixed, strict=True)
+
     def test_extract_xlsx_bytes_to_dict_basic(self):
         specs = [
             ExtractSpec(
@@ -147,6 +200,31 @@ class TestXlsxExtract(unittest.TestCase):
         self.assertEqual(out["lucroTrimestre"]["sheet"], "DRE Saida")
         self.assertEqual(out["lucroTrimestre"]["ranges"]["labels"], "C3:D3")
 
+    def test_extract_xlsx_bytes_to_dict_reuses_workbook_for_same_cache_key(self):
+        specs = [ExtractSpec(id="single", sheet="DRE Saida", labels_range="B2", values_range="B5")]
+
+        with patch("utils.xlsx_extract._load_workbook", return_value=_fake_workbook()) as load:
+            extract_xlsx_bytes_to_dict(memoryview(b"one"), specs, cache_key=b"k")
+            out = extract_xlsx_bytes_to_dict(b"two", specs, cache_key=b"k")
+            extract_xlsx_bytes_to_dict(b"two", specs)
+
+        self.assertEqual(out["single"]["Values"], [123.45])
+        self.assertEqual(load.call_count, 2)
+        # Uploads without a cache_key are parsed per call and not cached.
+        self.assertEqual(len(workbook_cache._CACHE), 1)
+
+    def test_extract_xlsx_bytes_to_dict_closes_uncached_workbook(self):
+        specs = [ExtractSpec(id="single", sheet="DRE Saida", labels_range="B2", values_range="B5")]
+        wb = _fake_workbook()
+        wb.close = Mock()
+
+        with patch("utils.xlsx_extract._load_workbook", return_value=wb):
+            out = extract_xlsx_bytes_to_dict(b"any", specs)
+
+        self.assertEqual(out["single"]["Values"], [123.45])
+        wb.close.assert_called_once_with()
+        self.assertEqual(len(workbook_cache._CACHE), 0)
+
     def test_extract_xlsx_bytes_to_dict_raises_on_empty_bytes(self):
         with self.assertRaises(ValueError):
             extract_xlsx_bytes_to_dict(b"", [ExtractSpec("x", "A1", "A1", sheet="S")])
@@ -187,6 +265,110 @@ class TestXlsxExtract(unittest.TestCase):
         self.assertEqual(out["single"]["Labels"], ["ONLY_LABEL"])
         self.assertEqual(out["single"]["Values"], [123.45])
 
+    def test_extract_workbook_to_dict_reads_each_sheet_once(self):
+        wb = _fake_workbook()
+        ws = wb["DRE Saida"]
+        calls = []
+        iter_rows = ws.iter_rows
+        ws.iter_rows = lambda **kw: calls.append(kw) or iter_rows(**kw)
+
+        specs = [
+            ExtractSpec(id="a", sheet="DRE Saida", labels_range="C3:D3", values_range="C18:D18"),
+            ExtractSpec(id="b", sheet="DRE Saida", labels_range="B2", values_range="B5"),
+        ]
+        out = extract_workbook_to_dict(wb, specs)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(out["a"]["Labels"], ["3T25", "4T25"])
+        self.assertEqual(out["a"]["Values"], [461.0, 500.0])
+        self.assertEqual(out["b"]["Labels"], ["ONLY_LABEL"])
+        self.assertEqual(out["b"]["Values"], [123.45])
+
+    def test_extract_xlsx_to_dict_reads_real_file_in_read_only_mode(self):
+        try:
+            from openpyxl import Workbook
+        except Exception:  # pragma: no cover
+            self.skipTest("openpyxl não instalado")
+
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "DRE Saida"
+        ws["C3"], ws["D3"] = "3T25", "4T25"
+        ws["C18"], ws["D18"] = 461, 500
+
+        with tempfile.TemporaryDirectory() as td:
+            xlsx_path = Path(td) / "file.xlsx"
+            wb.save(xlsx_path)
+
+            specs = [ExtractSpec(id="lucro", sheet="DRE Saida", labels_range="C3:D3", values_range="C18:E19")]
+            out = extract_xlsx_to_dict(xlsx_path, specs)
+
+        self.assertEqual(out["lucro"]["Labels"], ["3T25", "4T25"])
+        self.assertEqual(out["lucro"]["Values"], [461.0, 500.0, None, None, None, None])
+
+    def test_extract_xlsx_to_dict_parallel_sheets_match_serial(self):
+        try:
+            from openpyxl import Workbook
+        except Exception:  # pragma: no cover
+            self.skipTest("openpyxl não instalado")
+
+        wb = Workbook()
+        wb.active.title = "S0"
+        for i in range(3):
+            ws = wb[f"S{i}"] if i == 0 else wb.create_sheet(f"S{i}")
+            ws.append(["a", "b"])
+            ws.append([i, i + 0.5])
+
+        with tempfile.TemporaryDirectory() as td:
+            xlsx_path = Path(td) / "file.xlsx"
+            wb.save(xlsx_path)
+
+            specs = [ExtractSpec(id=f"s{i}", sheet=f"S{i}", labels_range="A1:B1", values_range="A2:B2") for i in range(3)]
+            with patch.object(xlsx_extract, "_PARALLEL_SHEETS", False):
+                serial = extract_xlsx_to_dict(xlsx_path, specs)
+            with patch.object(xlsx_extract, "_PARALLEL_SHEETS", True):
+                parallel = extract_xlsx_to_dict(xlsx_path, specs)
+
+        self.assertEqual(parallel, serial)
+        self.assertEqual(parallel["s2"]["Values"], [2.0, 2.5])
+
+    def test_extract_xlsx_to_dict_fast_backend_matches_openpyxl(self):
+        try:
+            from openpyxl import Workbook
+        except Exception:  # pragma: no cover
+            self.skipTest("openpyxl não instalado")
+
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "DRE Saida"
+        ws["C3"], ws["D3"] = "3T25", "4T25"
+        ws["C18"], ws["D18"] = 461, 500.5
+
+        with tempfile.TemporaryDirectory() as td:
+            xlsx_path = Path(td) / "file.xlsx"
+            wb.save(xlsx_path)
+
+            specs = [ExtractSpec(id="lucro", sheet="DRE Saida", labels_range="C3:D3", values_range="C18:E19")]
+            fast = extract_xlsx_to_dict(xlsx_path, specs, include_meta=True, backend="fast")
+            slow = extract_xlsx_to_dict(xlsx_path, specs, include_meta=True)
+            fast_bytes = extract_xlsx_bytes_to_dict(xlsx_path.read_bytes(), specs, backend="fast")
+            zip_wb = xlsx_extract._load_zip_workbook_cached(filename=xlsx_path)
+            workbook_cache.clear_workbook_cache()
+
+        self.assertIsNone(zip_wb._archive.fp)
+        self.assertEqual(fast, slow)
+        self.assertEqual(fast_bytes["lucro"]["Values"], [461.0, 500.5, None, None, None, None])
+
+    def test_extract_xlsx_bytes_to_dict_fast_backend_falls_back_and_validates(self):
+        specs = [ExtractSpec(id="x", sheet="DRE Saida", labels_range="B2", values_range="B5")]
+        with self.assertRaises(ValueError) as ctx:
+            extract_xlsx_bytes_to_dict(b"not a zip", specs, backend="fast")
+        self.assertIn("XLSX válido", str(ctx.exception))
+
+        with patch("utils.xlsx_extract._load_workbook", return_value=_fake_workbook()):
+            with self.assertRaises(ValueError):
+                extract_xlsx_bytes_to_dict(b"PK", specs, backend="turbo")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,9 +1,11 @@
 import json
 import tempfile
 import unittest
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 from unittest.mock import patch
 
+from utils import workbook_cache, xlsx_extract
 from utils.xlsx_text_fields import (
     TextFieldSpec,
     extract_workbook_text_mapping,
@@ -24,6 +26,11 @@ class _FakeWorksheet:
     def cell(self, row: int, column: int):
         return _FakeCell(self._values_by_rowcol.get((row, column)))
 
+    def iter_rows(self, *, min_row, max_row, min_col, max_col, values_only=False):
+        for r in range(min_row, max_row + 1):
+            cells = [self.cell(r, c) for c in range(min_col, max_col + 1)]
+            yield tuple(c.value for c in cells) if values_only else tuple(cells)
+
 
 class _FakeWorkbook:
     def __init__(self, sheets):
@@ -51,6 +58,10 @@ def _fake_workbook() -> _FakeWorkbook:
 
 
 class TestXlsxTextFields(unittest.TestCase):
+    def setUp(self):
+        # Loads are cached per path/bytes; keep each test's patched loader isolated.
+        workbook_cache.clear_workbook_cache()
+
     def test_parse_text_fields_object_format(self):
         payload = {
             "default_sheet": "DRE Saida",
@@ -81,6 +92,19 @@ class TestXlsxTextFields(unittest.TestCase):
         self.assertEqual(out["TEXTO"], "Texto")
         self.assertEqual(out["RANGE"], "A, B")
 
+    def test_extract_workbook_text_mapping_dates_use_isoformat(self):
+        utc = datetime(2025, 3, 31, 12, 0, tzinfo=timezone.utc)
+        brt = utc.astimezone(timezone(timedelta(hours=-3)))
+        ws = _FakeWorksheet({(1, 1): date(2025, 3, 31), (1, 2): datetime(2025, 3, 31), (1, 3): utc, (1, 4): brt})
+        specs = [TextFieldSpec(id=f"D{c}", a1_range=f"{'ABCD'[c - 1]}1") for c in range(1, 5)]
+
+        out = extract_workbook_text_mapping(_FakeWorkbook({"S": ws}), specs, default_sheet="S")
+
+        self.assertEqual(out["D1"], "2025-03-31")
+        self.assertEqual(out["D2"], "2025-03-31T00:00:00")
+        self.assertEqual(out["D3"], "2025-03-31T12:00:00+00:00")
+        self.assertEqual(out["D4"], "2025-03-31T09:00:00-03:00")
+
     def test_extract_workbook_text_mapping_sheet_override(self):
         specs = [
             TextFieldSpec(id="TAXA_DESCONTO", a1_range="B2", sheet="Premissas"),
@@ -101,6 +125,46 @@ class TestXlsxTextFields(unittest.TestCase):
 
         self.assertEqual(out["ROE_RECORRENTE"], "0.1234")
 
+    def test_extract_xlsx_to_text_mapping_reuses_loaded_workbook(self):
+        with tempfile.TemporaryDirectory() as td:
+            xlsx_path = Path(td) / "file.xlsx"
+            xlsx_path.write_bytes(b"placeholder")
+
+            specs = [TextFieldSpec(id="TEXTO", a1_range="B2", sheet="DRE Saida")]
+
+            with patch("utils.xlsx_extract._load_workbook", return_value=_fake_workbook()) as load:
+                extract_xlsx_to_text_mapping(xlsx_path, specs)
+                out = extract_xlsx_to_text_mapping(xlsx_path, specs)
+
+        self.assertEqual(out["TEXTO"], "Texto")
+        self.assertEqual(load.call_count, 1)
+
+    def test_var_fallback_opens_formula_workbook_only_when_needed(self):
+        formula_wb = _FakeWorkbook({"DRE Saida": _FakeWorksheet({(5, 2): 0.05, (6, 2): "=B5*2"})})
+
+        def load(*, filename, data_only=True, read_only=True):
+            return _fake_workbook() if data_only else formula_wb
+
+        with tempfile.TemporaryDirectory() as td:
+            xlsx_path = Path(td) / "file.xlsx"
+            xlsx_path.write_bytes(b"placeholder")
+
+            filled = [TextFieldSpec(id="VAR_ROE", a1_range="K20", sheet="DRE Saida")]
+            with patch("utils.xlsx_extract._load_workbook", side_effect=load) as loader:
+                out = extract_xlsx_to_text_mapping(xlsx_path, filled)
+            self.assertEqual(out["VAR_ROE"], "0.1234")
+            self.assertEqual(loader.call_count, 1)
+
+            empty = [
+                TextFieldSpec(id="VAR_A", a1_range="B5", sheet="DRE Saida"),
+                TextFieldSpec(id="VAR_B", a1_range="B6", sheet="DRE Saida"),
+            ]
+            with patch("utils.xlsx_extract._load_workbook", side_effect=load) as loader:
+                out = extract_xlsx_to_text_mapping(xlsx_path, empty)
+
+        self.assertEqual(out, {"VAR_A": "0.05", "VAR_B": ""})
+        self.assertEqual([c.kwargs["data_only"] for c in loader.call_args_list], [False])
+
 
 if __name__ == "__main__":
     unittest.main()
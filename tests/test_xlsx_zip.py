@@ -0,0 +1,107 @@
+import tempfile
+import unittest
+import zipfile
+from datetime import date, datetime
+from pathlib import Path
+
+try:
+    from openpyxl import Workbook, load_workbook
+except Exception:  # pragma: no cover
+    Workbook = None
+
+from utils.xlsx_zip import UnsupportedXlsx, ZipWorkbook
+
+_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_DOC_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+_RELS = f'<Relationships xmlns="{_PKG_REL}">{{}}</Relationships>'
+
+
+def _rows(wb, sheet, max_row, max_col, min_row=1):
+    rows = wb[sheet].iter_rows(min_row=min_row, max_row=max_row, min_col=1, max_col=max_col, values_only=True)
+    return [list(r) for r in rows]
+
+
+@unittest.skipIf(Workbook is None, "openpyxl não instalado")
+class TestZipWorkbook(unittest.TestCase):
+    def _save(self, td, wb) -> Path:
+        path = Path(td) / "file.xlsx"
+        wb.save(path)
+        return path
+
+    def test_values_match_openpyxl_read_only(self):
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "DRE Saida"
+        ws.append(["3T25", "4T25", None, "3T25"])
+        ws.append([461, 500.5, True, datetime(2025, 3, 31, 10, 5)])
+        ws["B4"] = date(2024, 2, 29)
+        ws["B4"].number_format = "dd/mm/yyyy"
+        ws["D6"] = "=B2*2"
+        wb.create_sheet("Premissas")["A1"] = "x"
+
+        with tempfile.TemporaryDirectory() as td:
+            path = self._save(td, wb)
+            ref = load_workbook(path, data_only=True, read_only=True)
+            zw = ZipWorkbook(path)
+            try:
+                expected = _rows(ref, "DRE Saida", 6, 4)
+                got = _rows(zw, "DRE Saida", 6, 4)
+            finally:
+                ref.close()
+                zw.close()
+
+            self.assertEqual(zw.sheetnames, ["DRE Saida", "Premissas"])
+            got += [[None] * 4] * (len(expected) - len(got))
+            self.assertEqual(got, expected)
+            self.assertEqual([type(v) for v in got[1]], [type(v) for v in expected[1]])
+
+    def test_reads_only_requested_rows_and_shared_strings_lazily(self):
+        # Excel (unlike openpyxl) writes text to sharedStrings.xml.
+        rows = "".join(
+            f'<row r="{r}"><c r="A{r}" t="s"><v>{r - 1}</v></c><c r="B{r}"><v>{r}</v></c></row>'
+            for r in range(1, 101)
+        )
+        strings = "".join(f"<si><t>s{i + 1}</t></si>" for i in range(100))
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "file.xlsx"
+            with zipfile.ZipFile(path, "w") as z:
+                z.writestr(
+                    "_rels/.rels",
+                    _RELS.format(f'<Relationship Id="rId1" Type="{_DOC_REL}/officeDocument" Target="xl/workbook.xml"/>'),
+                )
+                z.writestr(
+                    "xl/workbook.xml",
+                    f'<workbook xmlns="{_MAIN}" xmlns:r="{_DOC_REL}">'
+                    '<sheets><sheet name="S" sheetId="1" r:id="rId1"/></sheets></workbook>',
+                )
+                z.writestr(
+                    "xl/_rels/workbook.xml.rels",
+                    _RELS.format(
+                        f'<Relationship Id="rId1" Type="{_DOC_REL}/worksheet" Target="worksheets/sheet1.xml"/>'
+                        f'<Relationship Id="rId2" Type="{_DOC_REL}/sharedStrings" Target="sharedStrings.xml"/>'
+                    ),
+                )
+                z.writestr(
+                    "xl/worksheets/sheet1.xml", f'<worksheet xmlns="{_MAIN}"><sheetData>{rows}</sheetData></worksheet>'
+                )
+                z.writestr("xl/sharedStrings.xml", f'<sst xmlns="{_MAIN}">{strings}</sst>')
+
+            zw = ZipWorkbook(path)
+            got = _rows(zw, "S", 3, 2, min_row=2)
+            strings_src = zw._strings_src
+            self.assertFalse(strings_src.closed)
+            zw.close()
+
+        self.assertEqual(got, [["s2", 2], ["s3", 3]])
+        self.assertEqual(len(zw._strings), 3)
+        self.assertTrue(strings_src.closed)
+        self.assertIsNone(zw._archive.fp)
+
+    def test_rejects_non_xlsx(self):
+        with self.assertRaises(UnsupportedXlsx):
+            ZipWorkbook(b"not a zip")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,16 @@
+"""One-time matplotlib setup shared by the chart modules.
+
+Importing this selects the headless Agg backend once per process; chart code
+takes `plt` from here instead of re-running `matplotlib.use(...)` per chart.
+"""
+
+from __future__ import annotations
+
+import matplotlib
+
+# Headless rendering (safe for CLI jobs)
+matplotlib.use("Agg", force=True)
+
+import matplotlib.pyplot as plt  # noqa: E402
+
+__all__ = ["matplotlib", "plt"]
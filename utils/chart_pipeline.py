@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from utils.slide1_charts import generate_slide1_charts
+from utils.slide2_charts import generate_slide2_charts
+from utils.slide3_charts import generate_slide3_charts
+from utils.slide_pizza_charts import generate_pizza_charts
+from utils import _mpl_boot, charts_common, workbook_cache
+from utils.workbook_cache import load_workbook_cached
+
+# In deck order; each entry renders the PNGs of one slide.
+SLIDE_GENERATORS: List[Callable[..., List[Path]]] = [
+    generate_slide1_charts,
+    generate_slide2_charts,
+    generate_slide3_charts,
+    generate_pizza_charts,
+]
+
+
+def _init_worker(xlsx_path: str) -> None:
+    import utils._mpl_boot  # noqa: F401  (Agg backend, once per worker)
+
+    # Parse the workbook once per worker; the generators hit the same cache.
+    load_workbook_cached(xlsx_path)
+
+
+def _run_generator(generator: Callable[..., List[Path]], xlsx_path: str, output_dir: str) -> List[Path]:
+    return generator(xlsx_path=Path(xlsx_path), output_dir=Path(output_dir))
+
+
+# Modules behind every slide: plotting helpers, the Agg backend setup and the
+# workbook loader. Editing any of them invalidates all stamps.
+_SHARED_SOURCES = (charts_common.__file__, _mpl_boot.__file__, workbook_cache.__file__)
+
+
+def _stamp_path(generator: Callable[..., List[Path]], output_dir: Path) -> Path:
+    return output_dir / f".{generator.__name__}.hash"
+
+
+def _inputs_digest(generator: Callable[..., List[Path]], xlsx_path: Path) -> str:
+    """Fingerprint of everything a slide's PNGs depend on.
+
+    The chart specs live in the generator's module, so its source file stands
+    in for the spec, together with the shared modules every slide renders and
+    loads data through; the workbook is keyed by mtime+size.
+    """
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{generator.__module__}.{generator.__qualname__}".encode())
+    for path in (xlsx_path, sys.modules[generator.__module__].__file__, *_SHARED_SOURCES):
+        st = Path(path).stat()
+        h.update(f"|{Path(path).resolve()}:{st.st_mtime_ns}:{st.st_size}".encode())
+    return h.hexdigest()
+
+
+def _cached_outputs(stamp: Path, digest: str) -> Optional[List[Path]]:
+    """Outputs recorded in stamp if it matches digest and they all still exist."""
+
+    try:
+        lines = stamp.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return None
+    if not lines or lines[0] != digest:
+        return None
+    paths = [stamp.parent / name for name in lines[1:]]
+    if not all(p.exists() for p in paths):
+        return None
+    return paths
+
+
+def _write_stamp(stamp: Path, digest: str, paths: List[Path]) -> None:
+    stamp.write_text("\n".join([digest, *(Path(p).name for p in paths)]) + "\n", encoding="utf-8")
+
+
+def generate_all_charts(
+    *,
+    xlsx_path: Path,
+    output_dir: Path,
+    max_workers: Optional[int] = None,
+    force: bool = False,
+) -> List[Path]:
+    """Render every slide's PNGs, one slide per worker process.
+
+    Rasterization + PNG encoding is CPU-bound, so slides render in parallel.
+    max_workers=1 runs everything in the current process (handy for debugging).
+    Slides whose workbook and chart code are unchanged since the last run are
+    skipped (a `.<generator>.hash` stamp in output_dir); force=True redraws all.
+    Returns the generated paths in deck order.
+    """
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    results: List[Optional[List[Path]]] = []
+    digests: List[str] = []
+    for generator in SLIDE_GENERATORS:
+        digest = _inputs_digest(generator, xlsx_path)
+        digests.append(digest)
+        results.append(None if force else _cached_outputs(_stamp_path(generator, output_dir), digest))
+
+    pending = [i for i, cached in enumerate(results) if cached is None]
+    workers = max_workers or min(len(pending), os.cpu_count() or 1)
+
+    if pending and workers <= 1:
+        wb = load_workbook_cached(xlsx_path)
+        for i in pending:
+            results[i] = SLIDE_GENERATORS[i](xlsx_path=xlsx_path, output_dir=output_dir, wb=wb)
+    elif pending:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(str(xlsx_path),),
+        ) as pool:
+            futures = {
+                i: pool.submit(_run_generator, SLIDE_GENERATORS[i], str(xlsx_path), str(output_dir))
+                for i in pending
+            }
+            for i, fut in futures.items():
+                results[i] = fut.result()
+
+    for i in pending:
+        _write_stamp(_stamp_path(SLIDE_GENERATORS[i], output_dir), digests[i], results[i])
+
+    return [path for paths in results for path in paths]
@@ -1,20 +1,73 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
-from typing import List, Optional, Sequence, Tuple, Union
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
 import unicodedata
 
-import matplotlib
-
-# Headless rendering (safe for CLI jobs)
-matplotlib.use("Agg", force=True)
-
-import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 import numpy as np
-from openpyxl import load_workbook
 from openpyxl.utils.cell import range_boundaries
 
+from utils._mpl_boot import plt
+from utils.workbook_cache import load_workbook_cached
+
+# Idle figures keyed by (figsize, dpi). Creating a pyplot figure is the dominant
+# cost for small charts, so the plot_* helpers reuse one figure per size.
+_FIG_POOL: Dict[Tuple[float, float, float], plt.Figure] = {}
+
+
+def _acquire_fig(figsize: Tuple[float, float], dpi: Optional[float] = None) -> Tuple[plt.Figure, plt.Axes]:
+    """Return a pooled (fig, ax) for figsize/dpi, or allocate a new one."""
+
+    dpi = float(dpi if dpi is not None else plt.rcParams["figure.dpi"])
+    key = (float(figsize[0]), float(figsize[1]), dpi)
+    fig = _FIG_POOL.pop(key, None)
+    if fig is not None and len(fig.axes) == 1:
+        ax = fig.axes[0]
+        ax.clear()
+        # tight_layout() moved the axes on the previous use; start from rc defaults again.
+        fig.subplots_adjust(
+            **{k: plt.rcParams[f"figure.subplot.{k}"] for k in ("left", "right", "bottom", "top")}
+        )
+        return fig, ax
+    if fig is not None:
+        close_figure(fig)
+    return plt.subplots(figsize=key[:2], dpi=dpi)
+
+
+def _release_fig(fig: plt.Figure) -> None:
+    """Give a figure back to the pool once the caller is done with it."""
+
+    w, h = fig.get_size_inches()
+    key = (float(w), float(h), float(fig.dpi))
+    if key in _FIG_POOL or len(fig.axes) != 1:
+        close_figure(fig)
+        return
+    _FIG_POOL[key] = fig
+
+
+def make_clean_axes(figsize: Tuple[float, float], dpi: Optional[float] = None) -> Tuple[plt.Figure, plt.Axes]:
+    """Pooled (fig, ax) with transparent background, no spines and no ticks.
+
+    Hand it back with _release_fig once the chart is saved.
+    """
+
+    fig, ax = _acquire_fig(figsize, dpi)
+    fig.patch.set_alpha(0)
+    ax.set_facecolor("none")
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+    ax.set(xticks=[], yticks=[])
+    return fig, ax
+
+
+# PNG encoding is zlib-bound; level 1 is several times faster than the default 6
+# for slightly larger files. matplotlib hands these to Pillow's PNG writer.
+PNG_PIL_KWARGS: Dict[str, int] = {"compress_level": 1}
+
 
 def _parse_number_like(value: str) -> float:
     """Parse numeric strings, including pt-BR formats and percent strings.
@@ -124,13 +177,56 @@ class ExcelDonutChartSpec:
     font_scale: float = 1.0
 
 
+def _iter_range_rows(ws, min_col: int, min_row: int, max_col: int, max_row: int) -> Iterator[tuple]:
+    """Yield value tuples for a rectangle, padded with None to its full height.
+
+    Read-only worksheets stop iterating at the last row holding data, while
+    ws.cell() returned None past it; callers rely on the full shape.
+    """
+
+    seen = 0
+    for row in ws.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col, values_only=True):
+        seen += 1
+        yield row
+    empty = (None,) * (max_col - min_col + 1)
+    for _ in range(seen, max_row - min_row + 1):
+        yield empty
+
+
+# Chart specs reuse a few fixed A1 ranges; parse each one once.
+_range_bounds = lru_cache(maxsize=256)(range_boundaries)
+
+
 def _read_range_row(ws, cell_range: str) -> List[object]:
-    min_col, min_row, max_col, max_row = range_boundaries(cell_range)
-    out: List[object] = []
-    for r in range(min_row, max_row + 1):
-        for c in range(min_col, max_col + 1):
-            out.append(ws.cell(row=r, column=c).value)
-    return out
+    min_col, min_row, max_col, max_row = _range_bounds(cell_range)
+    return list(chain.from_iterable(_iter_range_rows(ws, min_col, min_row, max_col, max_row)))
+
+
+def _fast_range_row(ws, cell_range: str) -> List[object]:
+    """Values of the first row of cell_range, in one iter_rows call."""
+
+    min_col, min_row, max_col, _ = _range_bounds(cell_range)
+    return list(next(_iter_range_rows(ws, min_col, min_row, max_col, min_row)))
+
+
+def _fast_range_col(ws, cell_range: str) -> List[object]:
+    """Values of the first column of cell_range.
+
+    Uses iter_cols where the worksheet has it; read-only worksheets only
+    stream rows, so they fall back to a one-column iter_rows.
+    """
+
+    min_col, min_row, _, max_row = _range_bounds(cell_range)
+    if hasattr(ws, "iter_cols"):
+        cols = ws.iter_cols(min_col=min_col, max_col=min_col, min_row=min_row, max_row=max_row, values_only=True)
+        return list(next(cols))
+    return [row[0] for row in _iter_range_rows(ws, min_col, min_row, min_col, max_row)]
+
+
+@lru_cache(maxsize=256)
+def _fmt_is_percent(fmt: Optional[str]) -> bool:
+    # Workbooks reuse a handful of number formats, so this is a cache hit per cell.
+    return bool(fmt) and "%" in fmt
 
 
 def _cell_is_percent_formatted(cell) -> bool:
@@ -140,18 +236,14 @@ def _cell_is_percent_formatted(cell) -> bool:
         return False
     if not fmt:
         return False
-    return "%" in str(fmt)
+    return _fmt_is_percent(str(fmt))
 
 
 def read_range_col(ws, cell_range: str) -> List[object]:
     """Read a vertical A1 range and return a list."""
 
-    min_col, min_row, max_col, max_row = range_boundaries(cell_range)
-    out: List[object] = []
-    for r in range(min_row, max_row + 1):
-        for c in range(min_col, max_col + 1):
-            out.append(ws.cell(row=r, column=c).value)
-    return out
+    min_col, min_row, max_col, max_row = _range_bounds(cell_range)
+    return list(chain.from_iterable(_iter_range_rows(ws, min_col, min_row, max_col, max_row)))
 
 
 def to_float_list(values: Sequence[object]) -> List[float]:
@@ -170,15 +262,28 @@ def to_float_list(values: Sequence[object]) -> List[float]:
     return out
 
 
-def pchip_interpolate(x: np.ndarray, y: np.ndarray, x_new: np.ndarray) -> np.ndarray:
-    """Monotone cubic interpolation (PCHIP) in NumPy only."""
+@dataclass(frozen=True)
+class PCHIPCoef:
+    """Per-segment cubic coefficients of a PCHIP interpolant.
+
+    On segment k the curve is ((c3*t + c2)*t + c1)*t + c0 with t = x - x[k].
+    """
+
+    x: np.ndarray
+    c0: np.ndarray
+    c1: np.ndarray
+    c2: np.ndarray
+    c3: np.ndarray
+
+
+def pchip_build(x: np.ndarray, y: np.ndarray) -> PCHIPCoef:
+    """Fit a monotone cubic (PCHIP) interpolant; requires at least 2 points."""
 
     x = np.asarray(x, dtype=float)
     y = np.asarray(y, dtype=float)
-    x_new = np.asarray(x_new, dtype=float)
     n = x.size
     if n < 2:
-        return np.full_like(x_new, y[0] if n else np.nan, dtype=float)
+        raise ValueError("PCHIP precisa de pelo menos 2 pontos")
     if np.any(np.diff(x) <= 0):
         raise ValueError("x deve ser estritamente crescente")
 
@@ -190,13 +295,14 @@ def pchip_interpolate(x: np.ndarray, y: np.ndarray, x_new: np.ndarray) -> np.nda
         d[0] = delta[0]
         d[1] = delta[0]
     else:
-        for i in range(1, n - 1):
-            if delta[i - 1] == 0.0 or delta[i] == 0.0 or np.sign(delta[i - 1]) != np.sign(delta[i]):
-                d[i] = 0.0
-            else:
-                w1 = 2 * h[i] + h[i - 1]
-                w2 = h[i] + 2 * h[i - 1]
-                d[i] = (w1 + w2) / (w1 / delta[i - 1] + w2 / delta[i])
+        # Interior slopes: weighted harmonic mean where neighbours share a sign.
+        dl, dr = delta[:-1], delta[1:]
+        hl, hr = h[:-1], h[1:]
+        w1 = 2 * hr + hl
+        w2 = hr + 2 * hl
+        same_sign = (dl != 0.0) & (dr != 0.0) & (np.sign(dl) == np.sign(dr))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            d[1:-1] = np.where(same_sign, (w1 + w2) / (w1 / dl + w2 / dr), 0.0)
 
         d0 = ((2 * h[0] + h[1]) * delta[0] - h[0] * delta[1]) / (h[0] + h[1])
         if np.sign(d0) != np.sign(delta[0]):
@@ -212,34 +318,66 @@ def pchip_interpolate(x: np.ndarray, y: np.ndarray, x_new: np.ndarray) -> np.nda
             dn = 3 * delta[-1]
         d[-1] = dn
 
+    dk = d[:-1]
+    dk1 = d[1:]
+    return PCHIPCoef(
+        x=x,
+        c0=y[:-1].copy(),
+        c1=dk.copy(),
+        c2=(3 * delta - 2 * dk - dk1) / h,
+        c3=(dk + dk1 - 2 * delta) / (h * h),
+    )
+
+
+def pchip_segment_index(x: np.ndarray, x_new: np.ndarray) -> np.ndarray:
+    """Segment of each x_new within the knots x (clamped to the end segments)."""
+
     idx = np.searchsorted(x, x_new, side="right") - 1
-    idx = np.clip(idx, 0, n - 2)
-    xk = x[idx]
-    xk1 = x[idx + 1]
-    hk = xk1 - xk
-    t = (x_new - xk) / hk
+    return np.clip(idx, 0, np.size(x) - 2)
 
-    yk = y[idx]
-    yk1 = y[idx + 1]
-    dk = d[idx]
-    dk1 = d[idx + 1]
 
-    t2 = t * t
-    t3 = t2 * t
-    h00 = 2 * t3 - 3 * t2 + 1
-    h10 = t3 - 2 * t2 + t
-    h01 = -2 * t3 + 3 * t2
-    h11 = t3 - t2
+def pchip_eval(coef: PCHIPCoef, x_new: np.ndarray, idx: Optional[np.ndarray] = None) -> np.ndarray:
+    """Evaluate a PCHIPCoef at x_new (Horner scheme, cubic extrapolation at the ends).
 
-    return h00 * yk + h10 * hk * dk + h01 * yk1 + h11 * hk * dk1
+    idx (from pchip_segment_index) can be passed when several series share x and x_new.
+    """
+
+    x_new = np.asarray(x_new, dtype=float)
+    if idx is None:
+        idx = pchip_segment_index(coef.x, x_new)
+    t = x_new - coef.x[idx]
+    return ((coef.c3[idx] * t + coef.c2[idx]) * t + coef.c1[idx]) * t + coef.c0[idx]
+
+
+@lru_cache(maxsize=64)
+def _pchip_build_cached(x_bytes: bytes, y_bytes: bytes) -> PCHIPCoef:
+    return pchip_build(np.frombuffer(x_bytes, dtype=float), np.frombuffer(y_bytes, dtype=float))
+
+
+def pchip_interpolate(
+    x: np.ndarray, y: np.ndarray, x_new: np.ndarray, idx: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Monotone cubic interpolation (PCHIP) in NumPy only."""
+
+    x = np.ascontiguousarray(x, dtype=float)
+    y = np.ascontiguousarray(y, dtype=float)
+    x_new = np.asarray(x_new, dtype=float)
+    n = x.size
+    if n < 2:
+        return np.full_like(x_new, y[0] if n else np.nan, dtype=float)
+
+    # Replotting the same series only pays for evaluation.
+    coef = _pchip_build_cached(x.tobytes(), y.tobytes())
+    return pchip_eval(coef, x_new, idx)
 
 
-def plot_bar_from_excel(spec: ExcelBarChartSpec) -> Tuple[plt.Figure, plt.Axes]:
+def plot_bar_from_excel(spec: ExcelBarChartSpec, *, wb=None) -> Tuple[plt.Figure, plt.Axes]:
     file_path = Path(spec.file_path)
     if not file_path.exists():
         raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
 
-    wb = load_workbook(filename=file_path, data_only=True)
+    if wb is None:
+        wb = load_workbook_cached(file_path)
     if spec.sheet_name not in wb.sheetnames:
         raise ValueError(f"Aba não encontrada: {spec.sheet_name!r}. Disponíveis: {wb.sheetnames}")
 
@@ -251,9 +389,7 @@ def plot_bar_from_excel(spec: ExcelBarChartSpec) -> Tuple[plt.Figure, plt.Axes]:
     if len(values) != len(xlabels):
         raise ValueError(f"Tamanhos diferentes: valores={len(values)} xlabels={len(xlabels)}")
 
-    fig, ax = plt.subplots(figsize=(10, 4.8))
-    fig.patch.set_alpha(0)
-    ax.set_facecolor("none")
+    fig, ax = make_clean_axes((10, 4.8))
 
     n = len(values)
 
@@ -322,7 +458,10 @@ def plot_bar_from_excel(spec: ExcelBarChartSpec) -> Tuple[plt.Figure, plt.Axes]:
     delta_label_top: Optional[float] = None
     if spec.show_delta_pct and n >= 2:
         vals = np.asarray(values, dtype=float)
-        abs_max = float(np.nanmax(np.abs(vals))) if np.isfinite(np.nanmax(np.abs(vals))) else 0.0
+        abs_max = float(np.nanmax(np.abs(vals)))
+        if not np.isfinite(abs_max):
+            abs_max = 0.0
+        bar_centers = [rect.get_x() + rect.get_width() / 2 for rect in bars]
         offset_y = max(abs_max * 0.06, 0.5)
         bracket_h = max(abs_max * 0.03, 0.5)
 
@@ -349,8 +488,8 @@ def plot_bar_from_excel(spec: ExcelBarChartSpec) -> Tuple[plt.Figure, plt.Axes]:
             pct = (curr / prev - 1.0) * 100.0
             label = f"{pct:+.1f}%".replace(".", ",")
 
-            x1 = bars[pi].get_x() + bars[pi].get_width() / 2
-            x2 = bars[ci].get_x() + bars[ci].get_width() / 2
+            x1 = bar_centers[pi]
+            x2 = bar_centers[ci]
 
             top = max(prev, curr)
             base = top + offset_y if top >= 0 else top - offset_y
@@ -387,10 +526,9 @@ def plot_bar_from_excel(spec: ExcelBarChartSpec) -> Tuple[plt.Figure, plt.Axes]:
 
     ax.set_xticks(x_pos)
     ax.set_xticklabels(xlabels, rotation=0, fontsize=font_xtick)
-    ax.set_ylabel("")
-    ax.set_yticks([])
-    for s in ("left", "right", "top"):
-        ax.spines[s].set_visible(False)
+    ax.set(ylabel="", yticks=[])
+    for spine in ax.spines.values():
+        spine.set_visible(False)
     ax.spines["bottom"].set_visible(True)
     ax.tick_params(axis="y", left=False, labelleft=False)
     ax.yaxis.grid(False)
@@ -401,7 +539,9 @@ def plot_bar_from_excel(spec: ExcelBarChartSpec) -> Tuple[plt.Figure, plt.Axes]:
     if spec.output_path:
         out = Path(spec.output_path)
         out.parent.mkdir(parents=True, exist_ok=True)
-        fig.savefig(out, dpi=220, transparent=True, bbox_inches="tight", pad_inches=0.05)
+        fig.savefig(
+            out, dpi=220, transparent=True, bbox_inches="tight", pad_inches=0.05, pil_kwargs=PNG_PIL_KWARGS
+        )
 
     return fig, ax
 
@@ -424,12 +564,14 @@ def plot_line_from_excel(
     line_width: float = 2.2,
     label_fontsize: float = 9.0,
     marker_size: float = 26.0,
+    wb=None,
 ) -> Tuple[plt.Figure, plt.Axes]:
     file_path = Path(file_path)
     if not file_path.exists():
         raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
 
-    wb = load_workbook(filename=file_path, data_only=True)
+    if wb is None:
+        wb = load_workbook_cached(file_path)
     if sheet_name not in wb.sheetnames:
         raise ValueError(f"Aba não encontrada: {sheet_name!r}. Disponíveis: {wb.sheetnames}")
 
@@ -439,9 +581,8 @@ def plot_line_from_excel(
     # When fmt_as_percent=True, we want the chart labels in percentage points.
     min_col, min_row, max_col, max_row = range_boundaries(values_range)
     values: List[float] = []
-    for r in range(min_row, max_row + 1):
-        for c in range(min_col, max_col + 1):
-            cell = ws.cell(row=r, column=c)
+    for row_cells in ws.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col):
+        for cell in row_cells:
             raw = cell.value
             if raw is None or (isinstance(raw, str) and raw.strip() == ""):
                 v = 0.0
@@ -453,6 +594,8 @@ def plot_line_from_excel(
             if fmt_as_percent and _cell_is_percent_formatted(cell) and isinstance(raw, (int, float)):
                 v *= 100.0
             values.append(v)
+    # Read-only sheets end at the last row with data; missing cells count as 0.
+    values.extend([0.0] * ((max_row - min_row + 1) * (max_col - min_col + 1) - len(values)))
 
     xlabels = ["" if v is None else str(v) for v in _read_range_row(ws, xlabels_range)]
     if len(values) != len(xlabels):
@@ -461,9 +604,7 @@ def plot_line_from_excel(
     x = np.arange(len(values), dtype=float)
     y = np.asarray(values, dtype=float)
 
-    fig, ax = plt.subplots(figsize=(10, 4.2))
-    fig.patch.set_alpha(0)
-    ax.set_facecolor("none")
+    fig, ax = make_clean_axes((10, 4.2))
 
     if smooth and len(values) >= 3:
         xs = np.linspace(x.min(), x.max(), num=max(int(smooth_points), len(values) * 50))
@@ -519,40 +660,46 @@ def plot_line_from_excel(
         ymax += yr * float(y_expand)
     ax.set_ylim(ymin, ymax)
 
-    for s in ("left", "right", "top", "bottom"):
-        ax.spines[s].set_visible(False)
-    ax.set_xticks([])
-    ax.set_yticks([])
-    ax.tick_params(left=False, bottom=False, labelleft=False, labelbottom=False)
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+    ax.set(xticks=[], yticks=[], xlabel="", ylabel="", title="")
+    ax.tick_params(
+        axis="both",
+        which="both",
+        left=False,
+        right=False,
+        top=False,
+        bottom=False,
+        labelleft=False,
+        labelbottom=False,
+    )
     ax.grid(False)
-    ax.set_title("")
-    ax.set_xlabel("")
-    ax.set_ylabel("")
     ax.margins(x=0.03, y=0.08)
 
     fig.tight_layout(pad=0.2)
 
     out = Path(output_path)
     out.parent.mkdir(parents=True, exist_ok=True)
-    fig.savefig(out, dpi=220, transparent=True, bbox_inches="tight", pad_inches=0.08)
+    fig.savefig(out, dpi=220, transparent=True, bbox_inches="tight", pad_inches=0.08, pil_kwargs=PNG_PIL_KWARGS)
 
     return fig, ax
 
 
-def plot_donut_from_excel(spec: ExcelDonutChartSpec) -> Tuple[plt.Figure, plt.Axes]:
+def plot_donut_from_excel(spec: ExcelDonutChartSpec, *, wb=None) -> Tuple[plt.Figure, plt.Axes]:
     """
     Generate a nested donut chart from Excel data.
     
     - Outer ring: aggregated categories
     - Inner ring: individual segments with box labels
+
+    Pass ``wb`` to reuse a workbook that is already open.
     """
-    from collections import OrderedDict
-    
     file_path = Path(spec.file_path)
     if not file_path.exists():
         raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
 
-    wb = load_workbook(filename=file_path, data_only=True)
+    if wb is None:
+        wb = load_workbook_cached(file_path)
     if spec.sheet_name not in wb.sheetnames:
         raise ValueError(f"Aba não encontrada: {spec.sheet_name!r}. Disponíveis: {wb.sheetnames}")
 
@@ -573,13 +720,22 @@ def plot_donut_from_excel(spec: ExcelDonutChartSpec) -> Tuple[plt.Figure, plt.Ax
             labels.append(str(lbl))
             values.append(float(val) if val else 0.0)
 
-    # Aggregate by category for outer ring
-    category_totals = OrderedDict()
-    for cat, val in zip(categories, values):
-        category_totals[cat] = category_totals.get(cat, 0) + val
-    
-    cat_labels = list(category_totals.keys())
-    cat_values = list(category_totals.values())
+    # Aggregate by category for outer ring. np.unique sorts, so re-rank the
+    # groups by first occurrence to keep the sheet order of categories.
+    cat_group = np.zeros(len(categories), dtype=np.intp)
+    cat_labels: List[str] = []
+    cat_values: List[float] = []
+    if categories:
+        uniq, first_idx, inverse = np.unique(
+            np.array(categories, dtype=object), return_index=True, return_inverse=True
+        )
+        order = np.argsort(first_idx, kind="stable")
+        rank = np.empty_like(order)
+        rank[order] = np.arange(order.size)
+        cat_group = rank[np.ravel(inverse)]
+        cat_labels = [str(c) for c in uniq[order]]
+        totals = np.bincount(cat_group, weights=np.asarray(values, dtype=float), minlength=len(cat_labels))
+        cat_values = [float(v) for v in totals]
 
     def _norm_text(s: str) -> str:
         s = "" if s is None else str(s)
@@ -599,25 +755,6 @@ def plot_donut_from_excel(spec: ExcelDonutChartSpec) -> Tuple[plt.Figure, plt.Ax
         b = int(s[4:6], 16) / 255.0
         return (r, g, b)
 
-    def _rgb_to_hex(rgb: Tuple[float, float, float]) -> str:
-        r, g, b = rgb
-        r_i = int(max(0, min(255, round(r * 255.0))))
-        g_i = int(max(0, min(255, round(g * 255.0))))
-        b_i = int(max(0, min(255, round(b * 255.0))))
-        return f"#{r_i:02x}{g_i:02x}{b_i:02x}"
-
-    def _lighten(hex_color: str, t: float) -> str:
-        """Blend color with white. t=0 keeps original, t=1 becomes white."""
-        t = float(t)
-        if not np.isfinite(t):
-            t = 0.0
-        t = max(0.0, min(1.0, t))
-        r, g, b = _hex_to_rgb(hex_color)
-        r2 = r + (1.0 - r) * t
-        g2 = g + (1.0 - g) * t
-        b2 = b + (1.0 - b) * t
-        return _rgb_to_hex((r2, g2, b2))
-
     # Palette by top-level category (outer ring). Outer stays darkest; inner uses lighter shades.
     # NOTE: normalize to match variants like "Veículos" vs "Veiculos".
     base_by_category = {
@@ -645,27 +782,34 @@ def plot_donut_from_excel(spec: ExcelDonutChartSpec) -> Tuple[plt.Figure, plt.Ax
     else:
         # Generate inner colors as lighter shades within each category palette.
         inner_colors = ["#cccccc"] * len(labels)
-        cat_to_indices: "OrderedDict[str, List[int]]" = OrderedDict()
-        for idx, cat in enumerate(categories):
-            cat_to_indices.setdefault(cat, []).append(idx)
-
-        for cat, idxs in cat_to_indices.items():
-            base = _base_color_for_category(cat)
+        # Collect every (base, t) pair first and blend them with white in one
+        # broadcast (t=0 keeps the base, t=1 is white). ax.pie takes RGB floats.
+        order: List[int] = []
+        bases: List[str] = []
+        ts_all: List[float] = []
+        for k, cat in enumerate(cat_labels):
+            idxs = np.nonzero(cat_group == k)[0].tolist()
             m = len(idxs)
             if m <= 1:
                 ts = [0.40]
             else:
                 # Keep inner segments noticeably lighter than the outer ring.
                 ts = list(np.linspace(0.18, 0.68, num=m))
-            for j, idx in enumerate(idxs):
-                inner_colors[idx] = _lighten(base, ts[j])
+            order.extend(idxs)
+            bases.extend([_base_color_for_category(cat)] * m)
+            ts_all.extend(ts)
+
+        rgb_by_base = {b: _hex_to_rgb(b) for b in set(bases)}
+        bases_rgb = np.array([rgb_by_base[b] for b in bases], dtype=float).reshape(-1, 3)
+        ts_arr = np.clip(np.asarray(ts_all, dtype=float), 0.0, 1.0)[:, None]
+        blended = bases_rgb + (1.0 - bases_rgb) * ts_arr
+        for idx, rgb in zip(order, blended):
+            inner_colors[idx] = tuple(float(c) for c in rgb)
 
     font_scale = float(spec.font_scale) if spec.font_scale else 1.0
 
     # Create figure
-    fig, ax = plt.subplots(figsize=spec.figsize)
-    fig.patch.set_alpha(0)
-    ax.set_facecolor("none")
+    fig, ax = make_clean_axes(spec.figsize)
 
     # --- OUTER RING (Categories) ---
     outer_result = ax.pie(
@@ -690,26 +834,37 @@ def plot_donut_from_excel(spec: ExcelDonutChartSpec) -> Tuple[plt.Figure, plt.Ax
     inner_wedges = inner_result[0]
 
     # --- CATEGORY LABELS (outer ring) with boxes ---
+    # Angles/positions for all labels are computed up front; leader lines for
+    # each ring go into a single LineCollection instead of one arrow per label.
+    def _mid_angles(wedges) -> np.ndarray:
+        return 0.5 * (np.array([w.theta1 for w in wedges]) + np.array([w.theta2 for w in wedges]))
+
+    def _polar(r, ang_deg: np.ndarray) -> np.ndarray:
+        rad = np.deg2rad(ang_deg)
+        return np.column_stack((r * np.cos(rad), r * np.sin(rad)))
+
+    n_outer = min(len(outer_wedges), len(cat_labels), len(outer_colors))
+    outer_angs = _mid_angles(outer_wedges[:n_outer])
+    # Special adjustment for "Veiculos Leves" to avoid overlap
+    is_veiculos = np.array(["Veiculos" in lbl or "Veículos" in lbl for lbl in cat_labels[:n_outer]], dtype=bool)
+    outer_start = _polar(0.9, outer_angs)
+    outer_end = _polar(np.where(is_veiculos, 1.35, 1.18), outer_angs + np.where(is_veiculos, 15.0, 0.0))
+    ax.add_collection(
+        LineCollection(
+            np.stack((outer_start, outer_end), axis=1),
+            colors=outer_colors[:n_outer],
+            linewidths=2,
+            zorder=3,
+        )
+    )
+
     outer_total = sum(cat_values)
-    for i, (wedge, label, value, color) in enumerate(zip(outer_wedges, cat_labels, cat_values, outer_colors)):
-        ang = (wedge.theta2 + wedge.theta1) / 2
+    for (x, y), label, value, color in zip(outer_end, cat_labels, cat_values, outer_colors):
         pct = value / outer_total * 100
-
-        # Special adjustment for "Veiculos Leves" to avoid overlap
-        if "Veiculos" in label or "Veículos" in label:
-            r = 1.35
-            ang_adjusted = ang + 15
-        else:
-            r = 1.18
-            ang_adjusted = ang
-
-        x = r * np.cos(np.deg2rad(ang_adjusted))
-        y = r * np.sin(np.deg2rad(ang_adjusted))
-
-        ax.annotate(
+        ax.text(
+            x,
+            y,
             f"{label}\n{pct:.0f}%",
-            xy=(0.9 * np.cos(np.deg2rad(ang)), 0.9 * np.sin(np.deg2rad(ang))),
-            xytext=(x, y),
             fontsize=10 * font_scale,
             fontweight="bold",
             ha="center",
@@ -721,38 +876,32 @@ def plot_donut_from_excel(spec: ExcelDonutChartSpec) -> Tuple[plt.Figure, plt.Ax
                 edgecolor="white",
                 linewidth=2,
             ),
-            arrowprops=dict(
-                arrowstyle="-",
-                color=color,
-                lw=2,
-            ),
+            zorder=3,
         )
 
     # --- SEGMENT LABELS (inner ring) with boxes ---
+    n_inner = min(len(inner_wedges), len(labels), len(inner_colors))
+    inner_angs = _mid_angles(inner_wedges[:n_inner])
+    # Special adjustment for "Veiculos Leves Usados" to avoid overlap
+    is_usados = np.array(["Usados" in lbl for lbl in labels[:n_inner]], dtype=bool)
+    inner_start = _polar(0.55, inner_angs)
+    inner_end = _polar(np.where(is_usados, 1.65, 1.50), inner_angs - np.where(is_usados, 15.0, 0.0))
+    ax.add_collection(
+        LineCollection(
+            np.stack((inner_start, inner_end), axis=1),
+            colors=inner_colors[:n_inner],
+            linewidths=1,
+            zorder=3,
+        )
+    )
+
     inner_total = sum(values)
-    for i, (wedge, label, value, color) in enumerate(zip(inner_wedges, labels, values, inner_colors)):
-        ang = (wedge.theta2 + wedge.theta1) / 2
+    for (x, y), label, value, color in zip(inner_end, labels, values, inner_colors):
         pct = value / inner_total * 100
-
-        r_start = 0.55
-        x_start = r_start * np.cos(np.deg2rad(ang))
-        y_start = r_start * np.sin(np.deg2rad(ang))
-
-        # Special adjustment for "Veiculos Leves Usados" to avoid overlap
-        if "Usados" in label:
-            r_end = 1.65
-            ang_adjusted = ang - 15
-        else:
-            r_end = 1.50
-            ang_adjusted = ang
-
-        x_end = r_end * np.cos(np.deg2rad(ang_adjusted))
-        y_end = r_end * np.sin(np.deg2rad(ang_adjusted))
-
-        ax.annotate(
+        ax.text(
+            x,
+            y,
             f"{label}\n{pct:.0f}%",
-            xy=(x_start, y_start),
-            xytext=(x_end, y_end),
             fontsize=8 * font_scale,
             ha="center",
             va="center",
@@ -762,11 +911,7 @@ def plot_donut_from_excel(spec: ExcelDonutChartSpec) -> Tuple[plt.Figure, plt.Ax
                 edgecolor=color,
                 linewidth=1.5,
             ),
-            arrowprops=dict(
-                arrowstyle="-",
-                color=color,
-                lw=1,
-            ),
+            zorder=3,
         )
 
     # --- CENTER TEXT ---
@@ -794,12 +939,15 @@ def plot_donut_from_excel(spec: ExcelDonutChartSpec) -> Tuple[plt.Figure, plt.Ax
     # Save to file
     out = Path(spec.output_path)
     out.parent.mkdir(parents=True, exist_ok=True)
-    fig.savefig(out, dpi=220, transparent=True, bbox_inches="tight", pad_inches=0.08)
+    fig.savefig(out, dpi=220, transparent=True, bbox_inches="tight", pad_inches=0.08, pil_kwargs=PNG_PIL_KWARGS)
 
     return fig, ax
 
 
 def close_figure(fig: plt.Figure) -> None:
+    for key, pooled in list(_FIG_POOL.items()):
+        if pooled is fig:
+            del _FIG_POOL[key]
     try:
         plt.close(fig)
     except Exception:
@@ -1,18 +1,33 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Dict
+import re
+from pathlib import Path
+from typing import Any, Dict, Sequence, Union
+
+# orjson is an optional speedup for parsing LLM responses and config files; stdlib json is the
+# fallback (and the final word on inputs orjson rejects, e.g. NaN).
+try:  # pragma: no cover
+    import orjson as _orjson  # type: ignore
+except Exception:  # pragma: no cover
+    _orjson = None
 
 
 def strip_fences(text: str) -> str:
     text = (text or "").strip()
-    if text.startswith("```"):
-        nl = text.find("\n")
-        if nl != -1:
-            text = text[nl + 1 :]
-        if text.endswith("```"):
-            text = text[:-3]
-    return text.strip()
+    if not text.startswith("```"):
+        return text
+    nl = text.find("\n", 3)
+    if nl != -1:
+        text = text[nl + 1 :]
+    return text.removesuffix("```").strip()
+
+
+_DECODER = json.JSONDecoder()
+
+# Characters that can change the scanner state outside/inside a JSON string.
+_SCAN_OUTSIDE_RE = re.compile(r'[{}"\\]')
+_SCAN_INSIDE_RE = re.compile(r'["\\]')
 
 
 def first_json_object_slice(text: str) -> str:
@@ -20,37 +35,77 @@ def first_json_object_slice(text: str) -> str:
     if start == -1:
         raise json.JSONDecodeError("No JSON object found", text, 0)
 
+    # Fast path: the C decoder finds the end of a well-formed object directly.
+    try:
+        _obj, end = _DECODER.raw_decode(text, start)
+        return text[start:end]
+    except json.JSONDecodeError:
+        pass
+
+    # Fallback for malformed payloads: brace matching that jumps between
+    # structural characters with regex scans instead of visiting every char.
     depth = 0
     in_str = False
-    esc = False
+    i = start
 
-    for i in range(start, len(text)):
-        ch = text[i]
+    while True:
+        m = (_SCAN_INSIDE_RE if in_str else _SCAN_OUTSIDE_RE).search(text, i)
+        if m is None:
+            break
+        j = m.start()
+        ch = text[j]
+        i = j + 1
 
-        if esc:
-            esc = False
-            continue
         if ch == "\\":
-            esc = True
+            i = j + 2
             continue
         if ch == '"':
             in_str = not in_str
             continue
-        if in_str:
-            continue
         if ch == "{":
             depth += 1
-        elif ch == "}":
+        else:
             depth -= 1
             if depth == 0:
-                return text[start : i + 1]
+                return text[start : j + 1]
 
     raise json.JSONDecodeError("No complete JSON object found", text, start)
 
 
+def _loads(body: str) -> Any:
+    if _orjson is not None:
+        try:
+            return _orjson.loads(body)
+        except _orjson.JSONDecodeError:
+            pass
+    return json.loads(body)
+
+
+def first_key(item: Dict[str, Any], keys: Sequence[str]) -> Any:
+    """First truthy item[key] over keys, for config objects with key aliases."""
+
+    for key in keys:
+        value = item.get(key)
+        if value:
+            return value
+    return None
+
+
+def load_json_file(path: Union[str, Path]) -> Any:
+    """Parse a UTF-8 JSON file; orjson reads the raw bytes without a str decode."""
+
+    data = Path(path).read_bytes()
+    if _orjson is not None:
+        try:
+            return _orjson.loads(data)
+        except _orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
 def coerce_json(text: str) -> Dict[str, Any]:
     body = strip_fences(text)
     try:
-        return json.loads(body)
+        return _loads(body)
     except json.JSONDecodeError:
-        return json.loads(first_json_object_slice(body))
+        return _loads(first_json_object_slice(body))
@@ -2,13 +2,16 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from utils.charts_common import ExcelBarChartSpec, close_figure, plot_bar_from_excel, plot_line_from_excel
+from utils.charts_common import ExcelBarChartSpec, _release_fig, plot_bar_from_excel, plot_line_from_excel
+from utils.workbook_cache import load_workbook_cached
 
 
-def generate_slide1_charts(*, xlsx_path: Path, output_dir: Path) -> list[Path]:
+def generate_slide1_charts(*, xlsx_path: Path, output_dir: Path, wb=None) -> list[Path]:
     """Slide 1: gera 01, 02, 03, 04."""
 
     output_dir.mkdir(parents=True, exist_ok=True)
+    if wb is None:
+        wb = load_workbook_cached(xlsx_path)
 
     generated: list[Path] = []
 
@@ -26,9 +29,10 @@ def generate_slide1_charts(*, xlsx_path: Path, output_dir: Path) -> list[Path]:
             show_delta_bracket=True,
             delta_pairs=((-2, -1), (-5, -2)),
             output_path=output_dir / "01_lucro_trimestres.png",
-        )
+        ),
+        wb=wb,
     )
-    close_figure(fig)
+    _release_fig(fig)
     generated.append(output_dir / "01_lucro_trimestres.png")
 
     # 02) Lucro líquido - 9M
@@ -45,9 +49,10 @@ def generate_slide1_charts(*, xlsx_path: Path, output_dir: Path) -> list[Path]:
             show_delta_bracket=True,
             fixed_slot_count=9,
             output_path=output_dir / "02_lucro_9m.png",
-        )
+        ),
+        wb=wb,
     )
-    close_figure(fig)
+    _release_fig(fig)
     generated.append(output_dir / "02_lucro_9m.png")
 
     # 03) ROE - Trimestres
@@ -61,8 +66,9 @@ def generate_slide1_charts(*, xlsx_path: Path, output_dir: Path) -> list[Path]:
         y_baseline=0.0,
         y_expand=0.10,
         smooth=True,
+        wb=wb,
     )
-    close_figure(fig)
+    _release_fig(fig)
     generated.append(output_dir / "03_roe_trimestres.png")
 
     # 04) ROE - 9M
@@ -78,8 +84,9 @@ def generate_slide1_charts(*, xlsx_path: Path, output_dir: Path) -> list[Path]:
         label_fontsize=24.0,
         marker_size=96.0,
         label_offset_pts=18.0,
+        wb=wb,
     )
-    close_figure(fig)
+    _release_fig(fig)
     generated.append(output_dir / "04_roe_9m.png")
 
     return generated
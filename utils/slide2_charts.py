@@ -1,59 +1,97 @@
 from __future__ import annotations
 
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Sequence
 
 import numpy as np
-from openpyxl import load_workbook
+from matplotlib.collections import LineCollection
+from matplotlib.font_manager import FontProperties
+from matplotlib.transforms import offset_copy
 
-from utils.charts_common import close_figure, pchip_interpolate, read_range_col, to_float_list
+from utils.charts_common import (
+    PNG_PIL_KWARGS,
+    _fast_range_col,
+    _fast_range_row,
+    _iter_range_rows,
+    _release_fig,
+    make_clean_axes,
+    pchip_interpolate,
+    pchip_segment_index,
+    to_float_list,
+)
+from utils.workbook_cache import load_workbook_cached
 
 
-def _sanitize_filename(s: str) -> str:
-    import re
+_WS_RE = re.compile(r"\s+")
+_INVALID_FILENAME_RE = re.compile(r"[^A-Za-z0-9_.-]")
+
 
+def _sanitize_filename(s: str) -> str:
     s = (s or "").strip()
-    s = re.sub(r"\s+", "_", s)
-    s = re.sub(r"[^A-Za-z0-9_.-]", "", s)
+    s = _WS_RE.sub("_", s)
+    s = _INVALID_FILENAME_RE.sub("", s)
     return s or "serie"
 
 
+@lru_cache(maxsize=None)
+def _keywords_re(keywords: tuple[str, ...]) -> re.Pattern[str] | None:
+    kws = [re.escape(k.lower()) for k in keywords if k]
+    return re.compile("|".join(kws)) if kws else None
+
+
 def _find_title_index(titles: list[str], *keywords: str) -> int | None:
-    kws = [k.lower() for k in keywords if k]
-    for idx, t in enumerate(titles):
-        tl = (t or "").lower()
-        if any(k in tl for k in kws):
-            return idx
-    return None
+    """Index of the first title containing any keyword (case-insensitive)."""
+
+    pattern = _keywords_re(keywords)
+    if pattern is None:
+        return None
+    # One scan over all titles; NUL separators can't occur in a cell title.
+    blob = "\0".join((t or "").lower() for t in titles)
+    m = pattern.search(blob)
+    return None if m is None else blob.count("\0", 0, m.start())
+
+
+@lru_cache(maxsize=None)
+def _label_font(size: float, bold: bool) -> FontProperties:
+    return FontProperties(size=size, weight="bold" if bold else "normal")
 
 
 def plot_multi_line(
     *,
     xlabels: list[str],
-    series: list[tuple[str, list[float], dict]],
+    series: list[tuple[str, Sequence[float], dict]],
     output_path: Path,
     fmt_as_percent: bool = False,
     smooth: bool = True,
     smooth_points: int = 1400,
     y_pad_multiplier: float = 1.6,
 ):
-    import matplotlib
-
-    matplotlib.use("Agg", force=True)
-    import matplotlib.pyplot as plt
-
     x = np.arange(len(xlabels), dtype=float)
-    fig, ax = plt.subplots(figsize=(10, 4.2), dpi=200)
-    fig.patch.set_alpha(0)
-    ax.set_facecolor("none")
-
-    y_samples: list[float] = []
+    fig, ax = make_clean_axes((10, 4.2), dpi=200)
+
+    # Every series shares x, so the resampling grid and its segment lookup are built once.
+    xs = np.linspace(x.min(), x.max(), num=max(int(smooth_points), len(x) * 120)) if len(x) else x
+    xs_idx = pchip_segment_index(x, xs) if len(x) >= 2 else None
+
+    # Running extent of the finite values across all series.
+    y_min, y_max = np.inf, -np.inf
+    # All curves go into one LineCollection and all markers into one scatter.
+    line_segments: list[np.ndarray] = []
+    line_colors: list[str] = []
+    line_widths: list[float] = []
+    line_styles: list = []
+    marker_xy: list[np.ndarray] = []
+    marker_sizes: list[np.ndarray] = []
+    marker_colors: list[str] = []
 
     for _name, values, style in series:
         y = np.asarray(values, dtype=float)
         finite = np.isfinite(y)
         if finite.any():
-            y_samples.extend([float(v) for v in y[finite]])
+            y_min = min(y_min, float(y[finite].min()))
+            y_max = max(y_max, float(y[finite].max()))
 
         color = style.get("color", "#2f2f2f")
         linestyle = style.get("linestyle", "-")
@@ -69,87 +107,82 @@ def plot_multi_line(
         label_below = bool(style.get("label_below", False)) or is_dashed
 
         if smooth and len(values) >= 3:
-            xs = np.linspace(x.min(), x.max(), num=max(int(smooth_points), len(values) * 120))
-            ys = pchip_interpolate(x, y, xs)
-            (line,) = ax.plot(
-                xs,
-                ys,
-                linewidth=line_width,
-                color=color,
-                linestyle=linestyle,
-                zorder=2,
-            )
+            seg_x, seg_y = xs, pchip_interpolate(x, y, xs, xs_idx)
         else:
-            (line,) = ax.plot(
-                x,
-                y,
-                linewidth=line_width,
-                color=color,
-                linestyle=linestyle,
-                zorder=2,
-            )
-
-        line.set_antialiased(True)
-        line.set_solid_joinstyle("round")
-        line.set_solid_capstyle("round")
-        try:
-            line.set_dash_joinstyle("round")
-            line.set_dash_capstyle("round")
-        except Exception:
-            pass
-        try:
-            line.set_snap(False)
-        except Exception:
-            pass
-
-        if dashes is not None:
-            try:
-                line.set_dashes(dashes)
-            except Exception:
-                line.set_linestyle((0, dashes))
+            seg_x, seg_y = x, y
+        line_segments.append(np.column_stack([seg_x, seg_y]))
+        line_colors.append(color)
+        line_widths.append(line_width)
+        line_styles.append((0, tuple(dashes)) if dashes is not None else linestyle)
 
         if show_markers:
-            ax.scatter(x, y, s=marker_size, color=marker_color, zorder=3)
-
-        last_idx = len(values) - 1
-        for i, (xi, yi) in enumerate(zip(x, y)):
-            label = (
-                f"{yi:.1f}%".replace(".", ",")
-                if fmt_as_percent
-                else str(yi).replace(".", ",")
-            )
-            ax.annotate(
+            marker_xy.append(np.column_stack([x, y]))
+            marker_sizes.append(np.full(len(x), marker_size))
+            marker_colors.extend([marker_color] * len(x))
+
+        # Labels formatted in one pass; plain Text objects on a shared offset transform
+        # (no arrow, so annotate's extra machinery isn't needed).
+        raw_labels = np.char.mod("%.1f%%", y) if fmt_as_percent else y.astype(str)
+        labels = np.char.replace(raw_labels, ".", ",").tolist()
+        # Last point is bold; everything else shares the regular font.
+        fonts = [_label_font(label_fontsize, False)] * (len(labels) - 1) + [_label_font(label_fontsize, True)]
+        va = "top" if label_below else "bottom"
+        label_transform = offset_copy(
+            ax.transData,
+            fig=fig,
+            y=-abs(label_offset_pts) if label_below else abs(label_offset_pts),
+            units="points",
+        )
+        for xi, yi, label, font in zip(x, y, labels, fonts):
+            ax.text(
+                xi,
+                yi,
                 label,
-                (xi, yi),
-                textcoords="offset points",
-                xytext=(0, -abs(label_offset_pts) if label_below else abs(label_offset_pts)),
+                transform=label_transform,
                 ha="center",
-                va="top" if label_below else "bottom",
-                fontsize=label_fontsize,
+                va=va,
+                fontproperties=font,
                 color=color,
-                fontweight="bold" if i == last_idx else "normal",
                 clip_on=False,
             )
 
-    if y_samples:
-        y_min = min(y_samples)
-        y_max = max(y_samples)
+    if line_segments:
+        lines = LineCollection(
+            line_segments,
+            colors=line_colors,
+            linewidths=line_widths,
+            linestyles=line_styles,
+            capstyle="round",
+            joinstyle="round",
+            antialiaseds=True,
+            zorder=2,
+        )
+        lines.set_snap(False)
+        ax.add_collection(lines)
+    if marker_xy:
+        mxy = np.concatenate(marker_xy)
+        ax.scatter(mxy[:, 0], mxy[:, 1], s=np.concatenate(marker_sizes), color=marker_colors, zorder=3)
+
+    if y_min <= y_max:
         y_range = max(1e-9, y_max - y_min)
         pad = y_range * float(y_pad_multiplier)
         ax.set_ylim(y_min - pad, y_max + pad)
 
-    for s in ("left", "right", "top", "bottom"):
-        ax.spines[s].set_visible(False)
-    ax.set_xticks([])
-    ax.set_yticks([])
     ax.tick_params(left=False, bottom=False, labelleft=False, labelbottom=False)
     ax.grid(False)
     ax.margins(x=0.03)
     fig.tight_layout(pad=0.2)
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    fig.savefig(output_path, dpi=450, transparent=True, bbox_inches="tight", pad_inches=0.08)
-    close_figure(fig)
+    fig.savefig(
+        output_path,
+        dpi=450,
+        transparent=True,
+        bbox_inches="tight",
+        pad_inches=0.08,
+        pil_kwargs=PNG_PIL_KWARGS,
+    )
+    _release_fig(fig)
 
 
 def _pick_remaining(indices: Iterable[int], size: int) -> list[int]:
@@ -157,35 +190,33 @@ def _pick_remaining(indices: Iterable[int], size: int) -> list[int]:
     return [i for i in range(size) if i not in s]
 
 
-def generate_slide2_charts(*, xlsx_path: Path, output_dir: Path) -> list[Path]:
+def generate_slide2_charts(*, xlsx_path: Path, output_dir: Path, wb=None) -> list[Path]:
     """Slide 2: gera 05, 06, 07 a partir da aba 'Qualidade Cart 2682'."""
 
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    wb = load_workbook(filename=xlsx_path, data_only=True)
+    if wb is None:
+        wb = load_workbook_cached(xlsx_path)
     sheet_name = "Qualidade Cart 2682"
     if sheet_name not in wb.sheetnames:
         raise ValueError(f"Aba não encontrada: {sheet_name!r}. Disponíveis: {wb.sheetnames}")
     ws = wb[sheet_name]
 
-    raw_titles = read_range_col(ws, "B7:B10")
+    raw_titles = _fast_range_col(ws, "B7:B10")
     titles = [("" if v is None else str(v)).strip() for v in raw_titles]
 
-    raw_x = []
-    min_col, min_row, max_col, max_row = (3, 6, 16, 6)  # C6:P6
-    for c in range(min_col, max_col + 1):
-        raw_x.append(ws.cell(row=min_row, column=c).value)
+    raw_x = _fast_range_row(ws, "C6:P6")
 
     xlabels = [("" if v is None else str(v)).strip() for v in raw_x]
     if not any(xlabels):
         xlabels = [str(i + 1) for i in range(len(raw_x))]
 
-    values_rows: list[list[float]] = []
-    for r in range(7, 11):
-        row_vals = []
-        for c in range(3, 16 + 1):
-            row_vals.append(ws.cell(row=r, column=c).value)
-        values_rows.append(to_float_list(row_vals))
+    # C7:P10 in a single streamed pass, kept as one (series x periods) array;
+    # plot_multi_line takes the row views as-is.
+    values_rows = np.array(
+        [to_float_list(row_vals) for row_vals in _iter_range_rows(ws, 3, 7, 16, 10)],
+        dtype=float,
+    )
 
     def _name(i: int) -> str:
         t = titles[i] if i < len(titles) else ""
@@ -3,28 +3,22 @@ from __future__ import annotations
 from pathlib import Path
 
 import numpy as np
-from openpyxl import load_workbook
-from openpyxl.utils.cell import range_boundaries
+from matplotlib.collections import LineCollection
 
-from utils.charts_common import ExcelBarChartSpec, close_figure, to_float_list, plot_bar_from_excel
+from utils._mpl_boot import plt
+from utils.charts_common import (
+    PNG_PIL_KWARGS,
+    ExcelBarChartSpec,
+    _fast_range_row,
+    _iter_range_rows,
+    _release_fig,
+    make_clean_axes,
+    to_float_list,
+    plot_bar_from_excel,
+)
+from utils.workbook_cache import load_workbook_cached
 
-
-def _read_range_row(ws, cell_range: str) -> list[object]:
-    min_col, min_row, max_col, max_row = range_boundaries(cell_range)
-    out: list[object] = []
-    for r in range(min_row, max_row + 1):
-        for c in range(min_col, max_col + 1):
-            out.append(ws.cell(row=r, column=c).value)
-    return out
-
-
-def _read_range_col(ws, cell_range: str) -> list[object]:
-    min_col, min_row, max_col, max_row = range_boundaries(cell_range)
-    out: list[object] = []
-    for r in range(min_row, max_row + 1):
-        for c in range(min_col, max_col + 1):
-            out.append(ws.cell(row=r, column=c).value)
-    return out
+_BLUES = plt.cm.Blues
 
 
 def _normalize_label(s: str) -> str:
@@ -43,69 +37,72 @@ def _fmt_number(v: float, *, decimals: int = 1) -> str:
         return str(v)
 
 
-def _text_color_for_bg_rgba(rgba) -> str:
-    r, g, b = float(rgba[0]), float(rgba[1]), float(rgba[2])
-    lum = 0.2126 * r + 0.7152 * g + 0.0722 * b
-    return "#ffffff" if lum < 0.50 else "#2f2f2f"
+def _text_colors_for_bg_rgba(colors) -> np.ndarray:
+    """Readable text color (white/dark) for each RGBA background, by luminance."""
 
+    rgb = np.asarray(colors, dtype=float).reshape(-1, 4)[:, :3]
+    lum = rgb @ np.array([0.2126, 0.7152, 0.0722])
+    return np.where(lum < 0.50, "#ffffff", "#2f2f2f")
 
-def _read_emprestimos_table(*, xlsx_path: Path):
-    wb = load_workbook(filename=xlsx_path, data_only=True)
+
+def _read_emprestimos_table(*, xlsx_path: Path, wb=None):
+    if wb is None:
+        wb = load_workbook_cached(xlsx_path)
     sheet_name = "Emprestimos"
     if sheet_name not in wb.sheetnames:
         raise ValueError(f"Aba não encontrada: {sheet_name!r}. Disponíveis: {wb.sheetnames}")
     ws = wb[sheet_name]
 
-    raw_x = _read_range_row(ws, "D4:F4")
+    raw_x = _fast_range_row(ws, "D4:F4")
     xlabels = [("" if v is None else str(v)).strip() for v in raw_x]
     if not any(xlabels):
         xlabels = ["1", "2", "3"]
 
-    raw_cats = _read_range_col(ws, "C5:C9")
-    cat_labels = [("" if v is None else str(v)).strip() for v in raw_cats]
-
-    rows: list[tuple[str, list[float]]] = []
-    for r, label in zip(range(5, 10), cat_labels):
+    # C5:F9 in one pass: category label in C, values in D:F.
+    labels: list[str] = []
+    value_rows: list[list[float]] = []
+    for raw_label, *raw_vals in _iter_range_rows(ws, 3, 5, 6, 9):
+        label = ("" if raw_label is None else str(raw_label)).strip()
         if _is_total_row(label):
             continue
-        vals = to_float_list(_read_range_row(ws, f"D{r}:F{r}"))
-        rows.append((label, vals))
+        labels.append(label)
+        value_rows.append(to_float_list(raw_vals))
 
-    return xlabels, rows
+    # One (categories x periods) array instead of a list of per-row lists.
+    return xlabels, labels, np.array(value_rows, dtype=float).reshape(len(labels), 3)
 
 
-def _combine_consignado_demais(rows: list[tuple[str, list[float]]]) -> list[tuple[str, list[float]]]:
-    consignado: list[float] | None = None
-    demais: list[float] | None = None
-    out: list[tuple[str, list[float]]] = []
+def _combine_consignado_demais(labels: list[str], values: np.ndarray) -> tuple[list[str], np.ndarray]:
+    consignado: int | None = None
+    demais: int | None = None
+    keep: list[int] = []
 
-    for label, vals in rows:
+    for j, label in enumerate(labels):
         key = _normalize_label(label)
         if "consign" in key:
-            consignado = vals
+            consignado = j
             continue
         if key == "demais" or "demais" in key:
-            demais = vals
+            demais = j
             continue
-        out.append((label, vals))
+        keep.append(j)
 
     if consignado is None and demais is None:
-        return rows
-
-    if demais is None:
-        demais = [0.0] * len(consignado or [])
-    if consignado is None:
-        consignado = [0.0] * len(demais or [])
+        return labels, values
 
-    merged = [float(d) + float(c) for d, c in zip(demais, consignado)]
-    out.append(("Demais", merged))
-    return out
+    merged = np.zeros(values.shape[1], dtype=float)
+    for j in (demais, consignado):
+        if j is not None:
+            merged = merged + values[j]
+    out_labels = [labels[j] for j in keep] + ["Demais"]
+    return out_labels, np.vstack([values[keep], merged[np.newaxis, :]])
 
 
 def plot_emprestimos_stacked(
     *,
     xlabels: list[str],
-    rows: list[tuple[str, list[float]]],
+    labels: list[str],
+    values: np.ndarray,
     output_path: Path,
     show_segment_labels_left: bool = True,
     show_values_inside: bool = True,
@@ -116,57 +113,43 @@ def plot_emprestimos_stacked(
     figsize=(10, 4.8),
     dpi: int = 240,
 ):
-    import matplotlib
-
-    matplotlib.use("Agg", force=True)
-    import matplotlib.pyplot as plt
-
     n = len(xlabels)
     x = np.arange(n, dtype=float)
 
-    fig, ax = plt.subplots(figsize=figsize, dpi=int(dpi))
-
+    fig, ax = make_clean_axes(figsize, dpi=int(dpi))
     # Real transparency (figure + axes)
     fig.patch.set_facecolor("none")
-    fig.patch.set_alpha(0)
-    ax.set_facecolor("none")
-    try:
-        ax.patch.set_alpha(0)
-    except Exception:
-        pass
+    ax.patch.set_alpha(0)
 
-    cmap = plt.cm.Blues
-    colors = [cmap(v) for v in np.linspace(0.35, 0.85, num=max(1, len(rows)))]
+    cmap = _BLUES
+    colors = [cmap(v) for v in np.linspace(0.35, 0.85, num=max(1, len(labels)))]
 
     bar_width = 0.62
-    bottom = np.zeros(n, dtype=float)
-    segment_bottoms: list[np.ndarray] = []
-    segment_values: list[np.ndarray] = []
-    segment_labels: list[str] = []
-
-    for (label, vals), color in zip(rows, colors):
-        y = np.asarray(vals, dtype=float)
-        segment_labels.append(label)
-        segment_bottoms.append(bottom.copy())
-        segment_values.append(y.copy())
-        ax.bar(x, y, bottom=bottom, color=color, edgecolor="none", width=bar_width)
-        bottom = bottom + np.nan_to_num(y, nan=0.0)
-
-    if show_segment_labels_left and rows:
+    # (segments x bars); bottoms are the exclusive running sum of the filled values.
+    Y = np.asarray(values, dtype=float).reshape(len(labels), n)
+    cum = np.cumsum(np.nan_to_num(Y, nan=0.0), axis=0)
+    bottoms = np.vstack([np.zeros((1, n)), cum[:-1]])
+    centers = bottoms + Y / 2.0
+    totals = cum[-1] if labels else np.zeros(n, dtype=float)
+
+    for j, color in enumerate(colors[: len(labels)]):
+        ax.bar(x, Y[j], bottom=bottoms[j], color=color, edgecolor="none", width=bar_width)
+
+    finite = np.isfinite(Y)
+    absY = np.abs(np.where(finite, Y, 0.0))
+
+    if show_segment_labels_left and labels:
         ax.set_xlim(x.min() - float(left_label_margin_slots), x.max() + 0.9)
         x_label = x.min() - (bar_width / 2.0 + 0.25)
-        for j, label in enumerate(segment_labels):
-            y_center_ref = None
-            for i in range(n):
-                val = float(segment_values[j][i]) if i < segment_values[j].size else 0.0
-                if np.isfinite(val) and abs(val) > 1e-12:
-                    y_center_ref = float(segment_bottoms[j][i]) + val / 2.0
-                    break
-            if y_center_ref is None:
+        # Each label sits beside the first bar where its segment is non-empty.
+        has_seg = finite & (absY > 1e-12)
+        first_i = has_seg.argmax(axis=1)
+        for j, label in enumerate(labels):
+            if not has_seg[j].any():
                 continue
             ax.text(
                 x_label,
-                y_center_ref,
+                float(centers[j, first_i[j]]),
                 str(label),
                 ha="right",
                 va="center",
@@ -175,24 +158,20 @@ def plot_emprestimos_stacked(
                 clip_on=False,
             )
 
-    if show_values_inside and rows:
-        for i in range(n):
-            for j, color in enumerate(colors):
-                val = float(segment_values[j][i]) if i < segment_values[j].size else 0.0
-                if not np.isfinite(val) or abs(val) < 1e-12:
-                    continue
-                y_center = float(segment_bottoms[j][i]) + val / 2.0
-                ax.text(
-                    float(x[i]),
-                    y_center,
-                    _fmt_number(val, decimals=1),
-                    ha="center",
-                    va="center",
-                    fontsize=9 * float(font_scale),
-                    color=_text_color_for_bg_rgba(color),
-                )
+    if show_values_inside and labels:
+        text_colors = _text_colors_for_bg_rgba(colors).tolist()
+        # Bar-major order, same as drawing bar by bar.
+        for i, j in np.argwhere((finite & (absY >= 1e-12)).T):
+            ax.text(
+                float(x[i]),
+                float(centers[j, i]),
+                _fmt_number(Y[j, i], decimals=1),
+                ha="center",
+                va="center",
+                fontsize=9 * float(font_scale),
+                color=text_colors[j],
+            )
 
-    totals = bottom.copy()
     for i in range(n):
         total = float(totals[i])
         if not np.isfinite(total):
@@ -211,69 +190,70 @@ def plot_emprestimos_stacked(
             zorder=6,
         )
 
-    delta_label_top: float | None = None
     if show_delta_pct and n >= 2:
         vals = np.asarray(totals, dtype=float)
-        abs_max = float(np.nanmax(np.abs(vals))) if np.isfinite(np.nanmax(np.abs(vals))) else 0.0
+        abs_max = np.nanmax(np.abs(vals))
+        abs_max = float(abs_max) if np.isfinite(abs_max) else 0.0
         offset_y = max(abs_max * 0.06, 0.5)
         bracket_h = max(abs_max * 0.03, 0.5)
 
-        for level, i in enumerate(range(1, n)):
-            prev = float(vals[i - 1])
-            curr = float(vals[i])
-            if not np.isfinite(prev) or not np.isfinite(curr) or prev == 0:
-                continue
+        # One entry per consecutive pair; the stacking level is the pair index.
+        prev, curr = vals[:-1], vals[1:]
+        ok = np.isfinite(prev) & np.isfinite(curr) & (prev != 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
             pct = (curr / prev - 1.0) * 100.0
-            label = f"{pct:+.1f}%"
-
-            x1 = float(x[i - 1])
-            x2 = float(x[i])
-            top = max(prev, curr)
-            y_anchor = top + offset_y + level * (bracket_h + offset_y * 0.9)
-
-            if show_delta_bracket:
-                ax.plot(
-                    [x1, x1, x2, x2],
-                    [y_anchor, y_anchor + bracket_h, y_anchor + bracket_h, y_anchor],
-                    color="#2f2f2f",
-                    linewidth=1.2,
-                    solid_capstyle="round",
+        x1, x2 = x[:-1], x[1:]
+        tops = np.maximum(prev, curr)
+        y_anchor = tops + offset_y + np.arange(n - 1) * (bracket_h + offset_y * 0.9)
+
+        if show_delta_bracket:
+            y_top = y_anchor + bracket_h
+            # (pairs, 4, 2): up, across, down.
+            segments = np.stack(
+                [
+                    np.column_stack([x1, y_anchor]),
+                    np.column_stack([x1, y_top]),
+                    np.column_stack([x2, y_top]),
+                    np.column_stack([x2, y_anchor]),
+                ],
+                axis=1,
+            )
+            text_y = y_top + offset_y * 0.25
+        else:
+            segments = np.stack(
+                [np.column_stack([x1, prev + offset_y]), np.column_stack([x2, curr + offset_y])],
+                axis=1,
+            )
+            text_y = tops + offset_y * 1.15
+
+        if ok.any():
+            ax.add_collection(
+                LineCollection(
+                    segments[ok],
+                    colors="#2f2f2f",
+                    linewidths=1.2,
+                    capstyle="round",
+                    joinstyle="round",
                     zorder=4,
                 )
-                text_y = y_anchor + bracket_h + offset_y * 0.25
-            else:
-                ax.plot(
-                    [x1, x2],
-                    [prev + offset_y, curr + offset_y],
+            )
+            for k in np.flatnonzero(ok):
+                ax.text(
+                    (x1[k] + x2[k]) / 2.0,
+                    text_y[k],
+                    f"{pct[k]:+.1f}%",
+                    ha="center",
+                    va="bottom",
+                    fontsize=9 * float(font_scale),
                     color="#2f2f2f",
-                    linewidth=1.2,
-                    solid_capstyle="round",
-                    zorder=4,
+                    zorder=5,
+                    clip_on=False,
                 )
-                text_y = top + offset_y * 1.15
-
-            ax.text(
-                (x1 + x2) / 2.0,
-                text_y,
-                label,
-                ha="center",
-                va="bottom",
-                fontsize=9 * float(font_scale),
-                color="#2f2f2f",
-                zorder=5,
-                clip_on=False,
-            )
-            delta_label_top = text_y if delta_label_top is None else max(delta_label_top, text_y)
-
-        if delta_label_top is not None:
             cur_ymin, cur_ymax = ax.get_ylim()
-            ax.set_ylim(cur_ymin, max(cur_ymax, delta_label_top + offset_y))
+            ax.set_ylim(cur_ymin, max(cur_ymax, float(text_y[ok].max()) + offset_y))
 
     ax.set_xticks(x)
     ax.set_xticklabels(xlabels, rotation=0, fontsize=10 * float(font_scale))
-    ax.set_yticks([])
-    for s in ("left", "right", "top"):
-        ax.spines[s].set_visible(False)
     ax.spines["bottom"].set_visible(True)
     ax.tick_params(axis="y", left=False, labelleft=False)
     ax.grid(False)
@@ -290,24 +270,28 @@ def plot_emprestimos_stacked(
         edgecolor="none",
         bbox_inches="tight",
         pad_inches=0.06,
+        pil_kwargs=PNG_PIL_KWARGS,
     )
-    close_figure(fig)
+    _release_fig(fig)
 
 
-def generate_slide3_charts(*, xlsx_path: Path, output_dir: Path) -> list[Path]:
+def generate_slide3_charts(*, xlsx_path: Path, output_dir: Path, wb=None) -> list[Path]:
     """Slide 3: gera 08, 09."""
 
     output_dir.mkdir(parents=True, exist_ok=True)
+    if wb is None:
+        wb = load_workbook_cached(xlsx_path)
 
     generated: list[Path] = []
 
     # 08) Empréstimos - Empilhado
-    xlabels, rows = _read_emprestimos_table(xlsx_path=xlsx_path)
-    rows2 = _combine_consignado_demais(rows)
+    xlabels, labels, values = _read_emprestimos_table(xlsx_path=xlsx_path, wb=wb)
+    labels, values = _combine_consignado_demais(labels, values)
     out08 = output_dir / "08_emprestimos_empilhado.png"
     plot_emprestimos_stacked(
         xlabels=xlabels,
-        rows=rows2,
+        labels=labels,
+        values=values,
         output_path=out08,
         show_segment_labels_left=True,
         show_values_inside=True,
@@ -335,9 +319,10 @@ def generate_slide3_charts(*, xlsx_path: Path, output_dir: Path) -> list[Path]:
             bar_width_scale=0.70,
             font_scale=1.5,
             output_path=out09,
-        )
+        ),
+        wb=wb,
     )
-    close_figure(fig)
+    _release_fig(fig)
     generated.append(out09)
 
     return generated
@@ -5,16 +5,19 @@ from pathlib import Path
 from utils.charts_common import (
     ExcelBarChartSpec,
     ExcelDonutChartSpec,
-    close_figure,
+    _release_fig,
     plot_bar_from_excel,
     plot_donut_from_excel,
 )
+from utils.workbook_cache import load_workbook_cached
 
 
-def generate_pizza_charts(*, xlsx_path: Path, output_dir: Path) -> list[Path]:
+def generate_pizza_charts(*, xlsx_path: Path, output_dir: Path, wb=None) -> list[Path]:
     """Gera gráficos da worksheet 'Pizza Teste': donut + barras (10, 11, 12)."""
 
     output_dir.mkdir(parents=True, exist_ok=True)
+    if wb is None:
+        wb = load_workbook_cached(xlsx_path)
 
     generated: list[Path] = []
 
@@ -31,9 +34,10 @@ def generate_pizza_charts(*, xlsx_path: Path, output_dir: Path) -> list[Path]:
             output_path=output_dir / "10_pizza_carteira.png",
             figsize=(16, 12),
             font_scale=1.5,
-        )
+        ),
+        wb=wb,
     )
-    close_figure(fig)
+    _release_fig(fig)
     generated.append(output_dir / "10_pizza_carteira.png")
 
     # 11) Barras - Trimestres (H3:J3 labels, H4:J4 valores)
@@ -51,9 +55,10 @@ def generate_pizza_charts(*, xlsx_path: Path, output_dir: Path) -> list[Path]:
             delta_pairs=((0, 1), (1, 2)),
             font_scale=1.5,
             output_path=output_dir / "11_pizza_trimestres.png",
-        )
+        ),
+        wb=wb,
     )
-    close_figure(fig)
+    _release_fig(fig)
     generated.append(output_dir / "11_pizza_trimestres.png")
 
     # 12) Barras - 9M (K3:L3 labels, K4:L4 valores)
@@ -71,9 +76,10 @@ def generate_pizza_charts(*, xlsx_path: Path, output_dir: Path) -> list[Path]:
             fixed_slot_count=9,
             font_scale=1.5,
             output_path=output_dir / "12_pizza_9m.png",
-        )
+        ),
+        wb=wb,
     )
-    close_figure(fig)
+    _release_fig(fig)
     generated.append(output_dir / "12_pizza_9m.png")
 
     return generated
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Hashable, Optional, Tuple, Union
+
+# Parsed workbooks, most recently used last. Shared by the chart generators and
+# the extractors: a pipeline typically reads the same file several times
+# (charts, numeric specs, text fields, the VAR_* fallback). Read-only openpyxl
+# workbooks and ZipWorkbooks keep their archive open. Evicting or replacing an
+# entry only drops the cache's reference, since a caller may still be reading
+# it; the archive is closed once the last reference goes away.
+# clear_workbook_cache() closes everything explicitly.
+_CACHE: "OrderedDict[Hashable, Any]" = OrderedDict()
+_CACHE_SIZE = 4
+_LOCK = threading.Lock()
+
+
+def _reset_after_fork() -> None:
+    # A forked child (e.g. a ProcessPoolExecutor worker) inherits the parent's
+    # open archives and would share their file offsets; drop them unclosed,
+    # along with a lock another parent thread may have been holding.
+    global _CACHE, _LOCK
+    _CACHE = OrderedDict()
+    _LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):  # pragma: no cover (not on Windows)
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def close_workbook(wb) -> None:
+    # Read-only workbooks keep the source archive open until closed.
+    close = getattr(wb, "close", None)
+    if callable(close):
+        close()
+
+
+def source_key(
+    filename: Union[str, Path, bytes, bytearray, memoryview], cache_key: Optional[bytes] = None
+) -> Tuple[Tuple[Hashable, ...], Callable[[], Union[str, bytes]]]:
+    """(cache key, source getter) for a path or raw XLSX bytes.
+
+    Paths are keyed on (path, mtime_ns, size) so an edited file is parsed again;
+    raw bytes are keyed on cache_key when the caller already has a hash of the
+    upload, else on their blake2b digest.
+    """
+
+    if isinstance(filename, (bytes, bytearray, memoryview)):
+        buf = filename
+        digest = cache_key if cache_key is not None else hashlib.blake2b(buf, digest_size=16).digest()
+        # BytesIO shares an immutable bytes buffer; mutable buffers are copied on a cache miss.
+        return ("bytes", digest), lambda: buf if isinstance(buf, bytes) else bytes(buf)
+
+    path = os.path.realpath(os.fspath(filename))
+    st = os.stat(path)
+    return ("path", path, st.st_mtime_ns, st.st_size), lambda: path
+
+
+def _is_stale(key: Hashable, new_key: Hashable) -> bool:
+    # Same file, different (mtime, size): the file was edited since key was parsed.
+    return (
+        isinstance(key, tuple)
+        and isinstance(new_key, tuple)
+        and new_key[0] == "path"
+        and key[:2] == new_key[:2]
+        and key[2:4] != new_key[2:4]
+    )
+
+
+def cached_workbook(key: Hashable, load: Callable[[], Any]):
+    """Shared workbook for key, loading it on a miss.
+
+    Treat the result as read-only and don't close it. It stays usable after it
+    is evicted, for as long as the caller holds it.
+    """
+
+    with _LOCK:
+        wb = _CACHE.get(key)
+        if wb is not None:
+            _CACHE.move_to_end(key)
+            return wb
+
+    loaded = load()
+    with _LOCK:
+        wb = _CACHE.get(key)
+        if wb is None:
+            wb = _CACHE[key] = loaded
+            for old in [k for k in _CACHE if _is_stale(k, key)]:
+                del _CACHE[old]
+            while len(_CACHE) > _CACHE_SIZE:
+                _CACHE.popitem(last=False)
+            return wb
+        _CACHE.move_to_end(key)
+    # Another thread loaded the same key meanwhile; keep theirs. Nobody else
+    # has seen this copy, so it can be closed right away.
+    close_workbook(loaded)
+    return wb
+
+
+def clear_workbook_cache() -> None:
+    """Close and forget every cached workbook.
+
+    Only call it when no workbook from the cache is still in use (e.g. between
+    jobs or at shutdown).
+    """
+
+    with _LOCK:
+        to_close = list(_CACHE.values())
+        _CACHE.clear()
+    for wb in to_close:
+        close_workbook(wb)
+
+
+def load_workbook_cached(file_path: Union[str, Path], *, read_only: bool = True):
+    """Load an XLSX (data_only=True) once and share it between chart generators.
+
+    Lives in the shared cache (same key as the extractors' data_only loads),
+    keyed on the resolved path plus mtime/size, so an edited file is parsed
+    again. Callers must treat the returned workbook as read-only and not close
+    it; by default it is opened with read_only=True, so read ranges via
+    ws.iter_rows. clear_workbook_cache() closes everything.
+    """
+
+    from openpyxl import load_workbook
+
+    path = Path(file_path).resolve()
+    if not path.exists():
+        raise FileNotFoundError(f"Arquivo não encontrado: {path}")
+    key, source = source_key(path)
+    return cached_workbook(
+        (*key, True, bool(read_only)),
+        lambda: load_workbook(filename=source(), data_only=True, read_only=read_only),
+    )
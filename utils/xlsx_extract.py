@@ -1,24 +1,35 @@
 from __future__ import annotations
 
-import json
-import re
+import sys
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from io import BytesIO
+from itertools import chain
+from operator import itemgetter
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
+from utils.json_utils import first_key, load_json_file
+from utils.workbook_cache import cached_workbook, close_workbook, source_key
+from utils.xlsx_zip import UnsupportedXlsx, ZipWorkbook
+
 # openpyxl is used in production to read real XLSX files.
 # In some corporate unit-test environments it may be unavailable; tests can mock
 # the loader and still exercise the extraction logic. For that reason we keep
 # imports optional.
+try:  # pragma: no cover
+    import numpy as _np  # type: ignore
+except Exception:  # pragma: no cover
+    _np = None
+
 try:  # pragma: no cover
     from openpyxl import load_workbook as _openpyxl_load_workbook  # type: ignore
     from openpyxl.utils.exceptions import InvalidFileException  # type: ignore
-    from openpyxl.utils.cell import range_boundaries as _openpyxl_range_boundaries  # type: ignore
 except Exception:  # pragma: no cover
     _openpyxl_load_workbook = None
     InvalidFileException = None
-    _openpyxl_range_boundaries = None
 
 
 @dataclass(frozen=True)
@@ -31,45 +42,62 @@ class ExtractSpec:
     sheet: Optional[str] = None
 
 
-_A1_CELL_RE = re.compile(r"^\$?([A-Za-z]+)\$?(\d+)$")
+_UPPER = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+# A..ZZ (702 columns) covers every sheet we read; longer names use the loop.
+_COL_INDEX: Dict[str, int] = {ch: i for i, ch in enumerate(_UPPER, start=1)}
+_COL_INDEX.update({a + b: _COL_INDEX[a] * 26 + _COL_INDEX[b] for a in _UPPER for b in _UPPER})
 
 
 def _col_letters_to_index(letters: str) -> int:
     letters = letters.strip().upper()
-    if not letters.isalpha():
+    col = _COL_INDEX.get(letters)
+    if col is not None:
+        return col
+    if not (letters.isascii() and letters.isalpha()):
         raise ValueError(f"Coluna inválida: {letters!r}")
     col = 0
     for ch in letters:
-        col = col * 26 + (ord(ch) - ord("A") + 1)
+        col = col * 26 + (ord(ch) - 64)
     return col
 
 
+_DIGITS = b"0123456789"
+_COL_INDEX_BYTES: Dict[bytes, int] = {k.encode("ascii"): v for k, v in _COL_INDEX.items()}
+
+
+@lru_cache(maxsize=1024)
 def _a1_to_rowcol(a1: str) -> Tuple[int, int]:
+    # [$]LETTERS[$]DIGITS split with C-level bytes ops instead of a regex match.
     a1 = a1.strip()
-    m = _A1_CELL_RE.match(a1)
-    if not m:
+    b = a1.encode("ascii", "replace")
+    letters = b.rstrip(_DIGITS)
+    digits = b[len(letters) :]
+    if letters[:1] == b"$":
+        letters = letters[1:]
+    if letters[-1:] == b"$":
+        letters = letters[:-1]
+    if not digits or not letters.isalpha():
         raise ValueError(f"Célula A1 inválida: {a1!r}")
-    col_letters, row_s = m.groups()
-    row = int(row_s)
-    col = _col_letters_to_index(col_letters)
-    return row, col
+    letters = letters.upper()
+    col = _COL_INDEX_BYTES.get(letters)
+    if col is None:
+        col = _col_letters_to_index(letters.decode("ascii"))
+    return int(digits), col
 
 
+@lru_cache(maxsize=1024)
 def _range_boundaries(a1_range: str) -> Tuple[int, int, int, int]:
     a1_range = a1_range.strip()
     if not a1_range:
         raise ValueError("Range vazio")
 
-    # Prefer openpyxl's parsing when available.
-    if _openpyxl_range_boundaries is not None:  # pragma: no cover
-        min_col, min_row, max_col, max_row = _openpyxl_range_boundaries(a1_range)
-        return int(min_col), int(min_row), int(max_col), int(max_row)
-
+    # Own parser even with openpyxl installed: its range_boundaries is regex
+    # based and leaves reversed ranges (B2:A1) unsorted.
     if ":" not in a1_range:
         row, col = _a1_to_rowcol(a1_range)
         return col, row, col, row
 
-    left, right = [p.strip() for p in a1_range.split(":", 1)]
+    left, right = a1_range.split(":", 1)
     row1, col1 = _a1_to_rowcol(left)
     row2, col2 = _a1_to_rowcol(right)
     min_col, max_col = sorted((col1, col2))
@@ -77,19 +105,24 @@ def _range_boundaries(a1_range: str) -> Tuple[int, int, int, int]:
     return min_col, min_row, max_col, max_row
 
 
-def _load_workbook(*, filename, data_only: bool = True):
+def _load_workbook(*, filename, data_only: bool = True, read_only: bool = True):
     """Load an XLSX workbook using openpyxl.
 
+    read_only=True streams the sheets instead of building the full cell grid,
+    which is much faster for the few small ranges we read.
     Kept as a separate function so unit tests can patch it easily.
     """
 
     if _openpyxl_load_workbook is None:  # pragma: no cover
         raise RuntimeError("Dependência 'openpyxl' não instalada")
 
-    import zipfile
-
     try:
-        return _openpyxl_load_workbook(filename=filename, data_only=data_only)
+        return _openpyxl_load_workbook(
+            filename=filename,
+            data_only=data_only,
+            read_only=read_only,
+            keep_links=False,
+        )
     except (zipfile.BadZipFile, OSError, ValueError) as exc:
         raise ValueError("Arquivo enviado não é um XLSX válido") from exc
     except Exception as exc:
@@ -99,50 +132,250 @@ def _load_workbook(*, filename, data_only: bool = True):
         raise ValueError("Arquivo enviado não é um XLSX válido") from exc
 
 
-def _read_range_2d(ws, a1_range: str) -> List[List[Any]]:
+def _load_workbook_from_bytes(data: bytes, *, data_only: bool, read_only: bool):
+    if read_only:
+        # Read-only workbooks stream sheets from the buffer later, so it must stay open.
+        return _load_workbook(filename=BytesIO(data), data_only=data_only, read_only=True)
+    with BytesIO(data) as bio:
+        return _load_workbook(filename=bio, data_only=data_only, read_only=False)
+
+
+def _load_workbook_cached(
+    *,
+    filename: Union[str, Path, bytes, bytearray, memoryview],
+    data_only: bool = True,
+    read_only: bool = True,
+    cache_key: Optional[bytes] = None,
+):
+    """_load_workbook behind the shared workbook cache (keys: see workbook_cache.source_key).
+
+    The returned workbook is shared: treat it as read-only and don't close it.
+    """
+
+    key, source = source_key(filename, cache_key)
+
+    def load():
+        data = source()
+        if isinstance(data, bytes):
+            return _load_workbook_from_bytes(data, data_only=data_only, read_only=read_only)
+        return _load_workbook(filename=data, data_only=data_only, read_only=read_only)
+
+    return cached_workbook((*key, data_only, read_only), load)
+
+
+def _load_zip_workbook_cached(
+    *,
+    filename: Union[str, Path, bytes, bytearray, memoryview],
+    cache_key: Optional[bytes] = None,
+) -> ZipWorkbook:
+    """ZipWorkbook (data_only values) from the shared workbook cache."""
+
+    key, source = source_key(filename, cache_key)
+    return cached_workbook((*key, "zip"), lambda: ZipWorkbook(source()))
+
+
+def _parse_range(a1_range: str) -> Tuple[int, int, int, int]:
     a1_range = a1_range.strip()
     if not a1_range:
         raise ValueError("Range vazio")
+    return _range_boundaries(a1_range)
+
+
+def _read_block(ws, min_col: int, min_row: int, max_col: int, max_row: int) -> List[List[Any]]:
+    # One streamed pass over the rectangle instead of a ws.cell() per cell.
+    out: List[List[Any]] = [
+        list(row)
+        for row in ws.iter_rows(
+            min_row=min_row,
+            max_row=max_row,
+            min_col=min_col,
+            max_col=max_col,
+            values_only=True,
+        )
+    ]
+    # Read-only sheets stop at their last data row; keep the full range shape.
+    width = max_col - min_col + 1
+    out.extend([None] * width for _ in range(max_row - min_row + 1 - len(out)))
+    return out
 
-    min_col, min_row, max_col, max_row = _range_boundaries(a1_range)
 
+def _read_block_flat(ws, min_col: int, min_row: int, max_col: int, max_row: int) -> List[Any]:
+    """Row-major cell values of the rectangle in one list (no per-row lists)."""
+
+    flat: List[Any] = []
+    for row in ws.iter_rows(
+        min_row=min_row,
+        max_row=max_row,
+        min_col=min_col,
+        max_col=max_col,
+        values_only=True,
+    ):
+        flat.extend(row)
+    # Read-only sheets stop at their last data row; keep the full range shape.
+    size = (max_col - min_col + 1) * (max_row - min_row + 1)
+    if len(flat) < size:
+        flat.extend([None] * (size - len(flat)))
+    return flat
+
+
+def _read_range_2d(ws, a1_range: str) -> List[List[Any]]:
+    return _read_block(ws, *_parse_range(a1_range))
+
+
+def _read_range_flat(ws, a1_range: str) -> Tuple[List[Any], int, int]:
+    """(row-major values, rows, cols) of a1_range."""
+
+    min_col, min_row, max_col, max_row = _parse_range(a1_range)
+    flat = _read_block_flat(ws, min_col, min_row, max_col, max_row)
+    return flat, max_row - min_row + 1, max_col - min_col + 1
+
+
+def _read_ranges_flat(ws, bounds: Sequence[Tuple[int, int, int, int]]) -> List[List[Any]]:
+    """Read several rectangles of one sheet with a single pass over their bounding box.
+
+    Each rectangle comes back as a row-major flat list. Falls back to one pass
+    per rectangle when the bounding box would be mostly cells nobody asked for
+    (ranges far apart on the sheet).
+    """
+
+    if len(bounds) == 1:
+        return [_read_block_flat(ws, *bounds[0])]
+
+    u_min_col = min(b[0] for b in bounds)
+    u_min_row = min(b[1] for b in bounds)
+    u_max_col = max(b[2] for b in bounds)
+    u_max_row = max(b[3] for b in bounds)
+    width = u_max_col - u_min_col + 1
+    union_cells = width * (u_max_row - u_min_row + 1)
+    wanted_cells = sum((b[2] - b[0] + 1) * (b[3] - b[1] + 1) for b in bounds)
+    if union_cells > max(4 * wanted_cells, 4096):
+        return [_read_block_flat(ws, *b) for b in bounds]
+
+    block = _read_block_flat(ws, u_min_col, u_min_row, u_max_col, u_max_row)
     out: List[List[Any]] = []
-    for r in range(min_row, max_row + 1):
-        row_vals: List[Any] = []
-        for c in range(min_col, max_col + 1):
-            row_vals.append(ws.cell(row=r, column=c).value)
-        out.append(row_vals)
+    for min_col, min_row, max_col, max_row in bounds:
+        start = (min_row - u_min_row) * width + (min_col - u_min_col)
+        cols = max_col - min_col + 1
+        if cols == width:
+            # Full-width rectangles are contiguous in the flat block.
+            out.append(block[start : start + cols * (max_row - min_row + 1)])
+            continue
+        flat: List[Any] = []
+        for offset in range(start, start + width * (max_row - min_row + 1), width):
+            flat.extend(block[offset : offset + cols])
+        out.append(flat)
+    return out
+
+
+# Read sheets of a read-only workbook concurrently. Each ReadOnlyWorksheet
+# opens its own member stream and XML parser per iter_rows call (the shared
+# ZipFile serializes the underlying file reads), so sheets do not share parser
+# state. Regular workbooks keep the serial path. openpyxl builds cells in
+# Python, so under the GIL threads only add overhead: on by default only on
+# free-threaded interpreters.
+_PARALLEL_SHEETS = not getattr(sys, "_is_gil_enabled", lambda: True)()
+_MAX_SHEET_THREADS = 4
+
+
+def _read_ranges_by_sheet(
+    wb, requests: Iterable[Tuple[str, str]]
+) -> Dict[Tuple[str, str], Tuple[List[Any], int, int]]:
+    """Read every (sheet_name, a1_range) pair, streaming each sheet once.
+
+    Values map to (row-major flat values, rows, cols).
+    """
+
+    by_sheet: Dict[str, Dict[str, Tuple[int, int, int, int]]] = {}
+    for sheet_name, a1_range in requests:
+        ranges = by_sheet.setdefault(sheet_name, {})
+        if a1_range not in ranges:
+            ranges[a1_range] = _parse_range(a1_range)
+
+    jobs = [(wb[sheet_name], list(ranges.values())) for sheet_name, ranges in by_sheet.items()]
+    if _PARALLEL_SHEETS and len(jobs) >= 2 and getattr(wb, "read_only", False):
+        with ThreadPoolExecutor(max_workers=min(_MAX_SHEET_THREADS, len(jobs))) as pool:
+            flats_by_sheet = list(pool.map(lambda job: _read_ranges_flat(*job), jobs))
+    else:
+        flats_by_sheet = [_read_ranges_flat(ws, bounds) for ws, bounds in jobs]
+
+    out: Dict[Tuple[str, str], Tuple[List[Any], int, int]] = {}
+    for (sheet_name, ranges), (_ws, bounds), flats in zip(by_sheet.items(), jobs, flats_by_sheet):
+        for a1_range, (min_col, min_row, max_col, max_row), flat in zip(ranges, bounds, flats):
+            out[(sheet_name, a1_range)] = (flat, max_row - min_row + 1, max_col - min_col + 1)
     return out
 
 
+def _resolve_sheet_name(wb, spec_id: str, sheet: Optional[str], default_sheet: Optional[str]) -> str:
+    sheet_name = sheet or default_sheet
+    if not sheet_name:
+        raise ValueError(
+            f"Spec {spec_id!r} não tem sheet e nenhum default_sheet foi informado"
+        )
+    if sheet_name not in wb.sheetnames:
+        raise ValueError(
+            f"Aba não encontrada: {sheet_name!r} (spec={spec_id!r}). Disponíveis: {wb.sheetnames}"
+        )
+    return sheet_name
+
+
 def _to_1d(values_2d: List[List[Any]]) -> List[Any]:
+    # Kept for _read_range_2d callers; the extract paths read flat via
+    # _read_ranges_by_sheet.
     if not values_2d:
         return []
     rows = len(values_2d)
     cols = len(values_2d[0]) if rows else 0
 
+    # Blocks are throwaway per extraction and callers only read the result,
+    # so a single row is returned as-is instead of copied.
     if rows == 1:
-        return list(values_2d[0])
+        return values_2d[0]
     if cols == 1:
-        return [r[0] for r in values_2d]
-
-    flat: List[Any] = []
-    for r in values_2d:
-        flat.extend(r)
-    return flat
+        return list(map(itemgetter(0), values_2d))
+    return list(chain.from_iterable(values_2d))
 
 
 def _coerce_labels(values: Sequence[Any]) -> List[str]:
-    out: List[str] = []
-    for v in values:
-        out.append("") if v is None else out.append(str(v))
+    # Labels are nearly always str already; pass those through untouched.
+    return ["" if v is None else v if type(v) is str else str(v) for v in values]
+
+
+# Below this many cells the NumPy round-trip costs more than the Python loop.
+_VECTOR_COERCE_MIN = 64
+
+
+def _is_blank(v: Any) -> bool:
+    return v is None or (isinstance(v, str) and v.strip() == "")
+
+
+def _coerce_values_vectorized(values: Sequence[Any]) -> Optional[List[Optional[float]]]:
+    """One C-level float conversion for the whole range; None if any cell can't convert.
+
+    Empty cells (None) come out of the cast as NaN, so only NaN slots are
+    revisited to tell them apart from real NaN values.
+    """
+
+    try:
+        arr = _np.array(values, dtype=_np.float64)
+    except (TypeError, ValueError):
+        return None
+    out: List[Optional[float]] = arr.tolist()
+    for i in _np.flatnonzero(_np.isnan(arr)).tolist():
+        if values[i] is None:
+            out[i] = None
     return out
 
 
 def _coerce_values(values: Sequence[Any], *, strict: bool) -> List[Optional[float]]:
+    if _np is not None and len(values) >= _VECTOR_COERCE_MIN:
+        coerced = _coerce_values_vectorized(values)
+        if coerced is not None:
+            return coerced
+        # Some cell isn't numeric: the scalar loop decides (None or raise).
+
     out: List[Optional[float]] = []
     for v in values:
-        if v is None or (isinstance(v, str) and v.strip() == ""):
+        if _is_blank(v):
             out.append(None)
             continue
         if isinstance(v, (int, float)):
@@ -173,20 +406,20 @@ def extract_workbook_to_dict(
     sheet_key = "sheet" if lowercase_fields else "Sheet"
     ranges_key = "ranges" if lowercase_fields else "Ranges"
 
-    for spec in specs:
-        sheet_name = spec.sheet or default_sheet
-        if not sheet_name:
-            raise ValueError(
-                f"Spec {spec.id!r} não tem sheet e nenhum default_sheet foi informado"
-            )
-        if sheet_name not in wb.sheetnames:
-            raise ValueError(
-                f"Aba não encontrada: {sheet_name!r} (spec={spec.id!r}). Disponíveis: {wb.sheetnames}"
-            )
+    sheet_names = [_resolve_sheet_name(wb, spec.id, spec.sheet, default_sheet) for spec in specs]
+    # All ranges of a sheet are read in one pass, then sliced per spec.
+    blocks = _read_ranges_by_sheet(
+        wb,
+        (
+            (sheet_name, a1_range)
+            for spec, sheet_name in zip(specs, sheet_names)
+            for a1_range in (spec.labels_range, spec.values_range)
+        ),
+    )
 
-        ws = wb[sheet_name]
-        labels_raw = _to_1d(_read_range_2d(ws, spec.labels_range))
-        values_raw = _to_1d(_read_range_2d(ws, spec.values_range))
+    for spec, sheet_name in zip(specs, sheet_names):
+        labels_raw = blocks[(sheet_name, spec.labels_range)][0]
+        values_raw = blocks[(sheet_name, spec.values_range)][0]
 
         payload: Dict[str, Any] = {
             labels_key: _coerce_labels(labels_raw),
@@ -205,6 +438,50 @@ def extract_workbook_to_dict(
     return result
 
 
+_BACKENDS = ("openpyxl", "fast")
+
+
+def _extract_owned(wb, specs: Sequence[ExtractSpec], *, close: bool, **options: Any) -> Dict[str, Any]:
+    try:
+        return extract_workbook_to_dict(wb, specs, **options)
+    finally:
+        if close:
+            close_workbook(wb)
+
+
+def _extract_with_backend(
+    filename: Union[str, Path, bytes, memoryview],
+    specs: Sequence[ExtractSpec],
+    *,
+    backend: str,
+    read_only: bool,
+    cache_key: Optional[bytes],
+    **options: Any,
+) -> Dict[str, Any]:
+    if backend not in _BACKENDS:
+        raise ValueError(f"Backend inválido: {backend!r} (esperado um de {_BACKENDS})")
+
+    # One-off uploads (bytes without a cache_key) don't go through the shared
+    # cache: they're parsed for this call and closed right after.
+    cached = cache_key is not None or not isinstance(filename, (bytes, bytearray, memoryview))
+
+    if backend == "fast":
+        try:
+            if cached:
+                wb = _load_zip_workbook_cached(filename=filename, cache_key=cache_key)
+            else:
+                wb = ZipWorkbook(bytes(filename))
+            return _extract_owned(wb, specs, close=not cached, **options)
+        except UnsupportedXlsx:
+            pass  # Something the zip reader doesn't handle: let openpyxl read it.
+
+    if cached:
+        wb = _load_workbook_cached(filename=filename, data_only=True, read_only=read_only, cache_key=cache_key)
+    else:
+        wb = _load_workbook_from_bytes(bytes(filename), data_only=True, read_only=read_only)
+    return _extract_owned(wb, specs, close=not cached, **options)
+
+
 def extract_xlsx_to_dict(
     xlsx_path: Union[str, Path],
     specs: Sequence[ExtractSpec],
@@ -213,16 +490,26 @@ def extract_xlsx_to_dict(
     strict_numbers: bool = False,
     include_meta: bool = False,
     lowercase_fields: bool = False,
+    read_only: bool = True,
+    backend: str = "openpyxl",
 ) -> Dict[str, Any]:
+    """Extract specs from an XLSX file.
+
+    backend="fast" reads the sheet XML straight from the zip (see
+    utils.xlsx_zip), stopping after the last requested row; files it can't
+    handle fall back to openpyxl.
+    """
+
     xlsx_path = Path(xlsx_path)
     if not xlsx_path.exists():
         raise FileNotFoundError(f"XLSX não encontrado: {xlsx_path}")
 
-    wb = _load_workbook(filename=xlsx_path, data_only=True)
-
-    return extract_workbook_to_dict(
-        wb,
+    return _extract_with_backend(
+        xlsx_path,
         specs,
+        backend=backend,
+        read_only=read_only,
+        cache_key=None,
         default_sheet=default_sheet,
         strict_numbers=strict_numbers,
         include_meta=include_meta,
@@ -231,24 +518,34 @@ def extract_xlsx_to_dict(
 
 
 def extract_xlsx_bytes_to_dict(
-    xlsx_bytes: bytes,
+    xlsx_bytes: Union[bytes, memoryview],
     specs: Sequence[ExtractSpec],
     *,
     default_sheet: Optional[str] = None,
     strict_numbers: bool = False,
     include_meta: bool = False,
     lowercase_fields: bool = False,
+    read_only: bool = True,
+    cache_key: Optional[bytes] = None,
+    backend: str = "openpyxl",
 ) -> Dict[str, Any]:
-    if not xlsx_bytes:
-        raise ValueError("XLSX vazio")
+    """Extract specs from an in-memory XLSX.
 
-    bio = BytesIO(xlsx_bytes)
+    cache_key: optional precomputed hash of xlsx_bytes (e.g. from the upload
+    handler); repeated calls with the same key reuse the parsed workbook.
+    Without it the workbook is parsed for this call only and not cached.
+    backend: as in extract_xlsx_to_dict.
+    """
 
-    wb = _load_workbook(filename=bio, data_only=True)
+    if not len(xlsx_bytes):
+        raise ValueError("XLSX vazio")
 
-    return extract_workbook_to_dict(
-        wb,
+    return _extract_with_backend(
+        xlsx_bytes,
         specs,
+        backend=backend,
+        read_only=read_only,
+        cache_key=cache_key,
         default_sheet=default_sheet,
         strict_numbers=strict_numbers,
         include_meta=include_meta,
@@ -257,8 +554,7 @@ def extract_xlsx_bytes_to_dict(
 
 
 def parse_specs_json(path: Union[str, Path]) -> List[ExtractSpec]:
-    path = Path(path)
-    data = json.loads(path.read_text(encoding="utf-8"))
+    data = load_json_file(path)
     if not isinstance(data, list):
         raise ValueError("O arquivo de specs deve ser uma lista JSON")
 
@@ -267,12 +563,12 @@ def parse_specs_json(path: Union[str, Path]) -> List[ExtractSpec]:
         if not isinstance(item, dict):
             raise ValueError("Cada spec deve ser um objeto JSON")
 
-        spec_id = str(item.get("id") or item.get("ID") or "").strip()
+        spec_id = str(first_key(item, ("id", "ID")) or "").strip()
         if not spec_id:
             raise ValueError("Spec sem 'id'")
 
-        labels_range = item.get("labels_range") or item.get("labels")
-        values_range = item.get("values_range") or item.get("values")
+        labels_range = first_key(item, ("labels_range", "labels"))
+        values_range = first_key(item, ("values_range", "values"))
         sheet = item.get("sheet")
 
         if not labels_range or not values_range:
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-import json
 from dataclasses import dataclass
 from datetime import date, datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
 from utils import xlsx_extract
+from utils.json_utils import first_key, load_json_file
 
 
 @dataclass(frozen=True)
@@ -18,11 +19,20 @@ class TextFieldSpec:
     sheet: Optional[str] = None
 
 
+@lru_cache(maxsize=256)
+def _iso(value: Union[date, datetime]) -> str:
+    # Report periods repeat across a batch of fields.
+    return value.isoformat()
+
+
 def _coerce_cell_value_to_str(value: Any) -> str:
     if value is None:
         return ""
+    if type(value) is str:
+        return value
     if isinstance(value, (datetime, date)):
-        return value.isoformat()
+        # Aware datetimes that are equal across time zones would share a cache slot.
+        return _iso(value) if getattr(value, "tzinfo", None) is None else value.isoformat()
     return str(value)
 
 
@@ -48,8 +58,7 @@ def parse_text_fields_json(path: Union[str, Path]) -> tuple[Optional[str], List[
     Returns: (default_sheet, specs)
     """
 
-    path = Path(path)
-    raw = json.loads(path.read_text(encoding="utf-8"))
+    raw = load_json_file(path)
 
     default_sheet: Optional[str] = None
     specs: List[TextFieldSpec] = []
@@ -59,9 +68,9 @@ def parse_text_fields_json(path: Union[str, Path]) -> tuple[Optional[str], List[
             if not isinstance(item, dict):
                 raise ValueError("Cada item deve ser um objeto")
 
-            field_id = item.get("id") or item.get("ID")
-            sheet = item.get("sheet") or item.get("Sheet")
-            a1 = item.get("cell") or item.get("Cell") or item.get("range") or item.get("Range")
+            field_id = first_key(item, ("id", "ID"))
+            sheet = first_key(item, ("sheet", "Sheet"))
+            a1 = first_key(item, ("cell", "Cell", "range", "Range"))
 
             if not field_id or not a1:
                 raise ValueError("Item precisa ter 'id' e 'cell' (ou 'range')")
@@ -73,7 +82,7 @@ def parse_text_fields_json(path: Union[str, Path]) -> tuple[Optional[str], List[
     if not isinstance(raw, dict):
         raise ValueError("Config deve ser um objeto ou uma lista")
 
-    default_sheet = raw.get("default_sheet") or raw.get("DEFAULT_SHEET")
+    default_sheet = first_key(raw, ("default_sheet", "DEFAULT_SHEET"))
     fields = raw.get("fields")
     if not isinstance(fields, dict):
         raise ValueError("Config no formato objeto precisa ter 'fields' (objeto)")
@@ -83,7 +92,7 @@ def parse_text_fields_json(path: Union[str, Path]) -> tuple[Optional[str], List[
             specs.append(TextFieldSpec(id=str(key), a1_range=value, sheet=None))
             continue
         if isinstance(value, dict):
-            a1 = value.get("cell") or value.get("range")
+            a1 = first_key(value, ("cell", "range"))
             if not a1:
                 raise ValueError(f"Campo {key!r} precisa ter 'cell' (ou 'range')")
             sheet = value.get("sheet")
@@ -102,20 +111,21 @@ def extract_workbook_text_mapping(
 ) -> Dict[str, str]:
     out: Dict[str, str] = {}
 
-    for spec in specs:
-        sheet_name = spec.sheet or default_sheet
-        if not sheet_name:
-            raise ValueError(
-                f"Spec {spec.id!r} não tem sheet e nenhum default_sheet foi informado"
-            )
-        if sheet_name not in wb.sheetnames:
-            raise ValueError(
-                f"Aba não encontrada: {sheet_name!r} (spec={spec.id!r}). Disponíveis: {wb.sheetnames}"
-            )
-
-        ws = wb[sheet_name]
-        values_2d = xlsx_extract._read_range_2d(ws, spec.a1_range)
-        values_1d = xlsx_extract._to_1d(values_2d)
+    sheet_names = [
+        xlsx_extract._resolve_sheet_name(wb, spec.id, spec.sheet, default_sheet) for spec in specs
+    ]
+    # One pass per sheet over all of its fields.
+    blocks = xlsx_extract._read_ranges_by_sheet(
+        wb, ((sheet_name, spec.a1_range) for spec, sheet_name in zip(specs, sheet_names))
+    )
+
+    for spec, sheet_name in zip(specs, sheet_names):
+        values_1d, _rows, _cols = blocks[(sheet_name, spec.a1_range)]
+        # Most fields are a single cell: no joining needed.
+        if len(values_1d) == 1:
+            out[spec.id] = _coerce_cell_value_to_str(values_1d[0])
+            continue
+
         pieces = [_coerce_cell_value_to_str(v) for v in values_1d]
 
         # If a range produces multiple cells, join with ", ".
@@ -130,6 +140,36 @@ def extract_workbook_text_mapping(
     return out
 
 
+def _var_fallback_candidates(
+    wb,
+    specs: Sequence[TextFieldSpec],
+    out: Dict[str, str],
+    *,
+    default_sheet: Optional[str],
+) -> List[Tuple[TextFieldSpec, str]]:
+    """Empty VAR_* single-cell fields worth re-reading without data_only."""
+
+    candidates: List[Tuple[TextFieldSpec, str]] = []
+    for spec in specs:
+        if not str(spec.id).upper().startswith("VAR_") or out.get(spec.id, "") != "":
+            continue
+
+        sheet_name = spec.sheet or default_sheet
+        if not sheet_name or sheet_name not in wb.sheetnames:
+            continue
+
+        # Only attempt for single-cell references.
+        try:
+            min_col, min_row, max_col, max_row = xlsx_extract._range_boundaries(spec.a1_range)
+        except Exception:
+            continue
+        if min_col != max_col or min_row != max_row:
+            continue
+
+        candidates.append((spec, sheet_name))
+    return candidates
+
+
 def extract_xlsx_to_text_mapping(
     xlsx_path: Union[str, Path],
     specs: Sequence[TextFieldSpec],
@@ -140,34 +180,23 @@ def extract_xlsx_to_text_mapping(
     if not xlsx_path.exists():
         raise FileNotFoundError(f"XLSX não encontrado: {xlsx_path}")
 
-    wb = xlsx_extract._load_workbook(filename=xlsx_path, data_only=True)
+    # Cached: extract_xlsx_to_dict on the same file reuses this parse.
+    wb = xlsx_extract._load_workbook_cached(filename=xlsx_path, data_only=True, read_only=True)
     out = extract_workbook_text_mapping(wb, specs, default_sheet=default_sheet)
 
     # Excel formulas: openpyxl does not calculate formulas.
     # If the file was not saved with cached results, data_only=True may return None.
     # For VAR_* fields (quarter deltas), try a fallback read from data_only=False and
-    # use the cached value if present.
-    var_specs = [s for s in specs if str(s.id).upper().startswith("VAR_")]
-    if var_specs and any(out.get(s.id, "") == "" for s in var_specs):
-        wb_formula = xlsx_extract._load_workbook(filename=xlsx_path, data_only=False)
-        for spec in var_specs:
-            if out.get(spec.id, "") != "":
-                continue
-
-            sheet_name = spec.sheet or default_sheet
-            if not sheet_name or sheet_name not in wb_formula.sheetnames:
-                continue
-
-            # Only attempt for single-cell references.
-            try:
-                min_col, min_row, max_col, max_row = xlsx_extract._range_boundaries(spec.a1_range)
-            except Exception:
-                continue
-            if min_col != max_col or min_row != max_row:
-                continue
-
-            ws = wb_formula[sheet_name]
-            v = ws.cell(row=min_row, column=min_col).value
+    # use the cached value if present. The second parse is only paid when some
+    # empty VAR_* field points at a single cell of an existing sheet.
+    candidates = _var_fallback_candidates(wb, specs, out, default_sheet=default_sheet)
+    if candidates:
+        wb_formula = xlsx_extract._load_workbook_cached(filename=xlsx_path, data_only=False, read_only=True)
+        blocks = xlsx_extract._read_ranges_by_sheet(
+            wb_formula, ((sheet_name, spec.a1_range) for spec, sheet_name in candidates)
+        )
+        for spec, sheet_name in candidates:
+            v = blocks[(sheet_name, spec.a1_range)][0][0]
             if v is None:
                 continue
             # If it's a formula string, we can't evaluate here.
@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import posixpath
+import threading
+import xml.etree.ElementTree as ET
+import zipfile
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+# Date conversions follow openpyxl exactly, so values match backend="openpyxl".
+try:  # pragma: no cover
+    from openpyxl.styles.numbers import builtin_format_code, is_date_format, is_timedelta_format  # type: ignore
+    from openpyxl.utils.datetime import (  # type: ignore
+        CALENDAR_MAC_1904,
+        CALENDAR_WINDOWS_1900,
+        from_excel,
+        from_ISO8601,
+    )
+except Exception:  # pragma: no cover
+    from_excel = None
+
+
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_DOC_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_OFFICE_DOCUMENT_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+_STYLES_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles"
+_SHARED_STRINGS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings"
+_WORKSHEET_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"
+
+_ROW = _MAIN_NS + "row"
+_V = _MAIN_NS + "v"
+_T = _MAIN_NS + "t"
+_R = _MAIN_NS + "r"
+_IS = _MAIN_NS + "is"
+_SI = _MAIN_NS + "si"
+
+
+class UnsupportedXlsx(Exception):
+    """The file uses something ZipWorkbook doesn't read; use openpyxl instead."""
+
+
+def _rich_text(node: Optional[ET.Element]) -> str:
+    # Plain <t> plus the <r><t> runs; phonetic <rPh> runs are skipped (as openpyxl).
+    if node is None:
+        return ""
+    parts = [node.findtext(_T) or ""]
+    parts.extend(run.findtext(_T) or "" for run in node.iterfind(_R))
+    return "".join(parts)
+
+
+@lru_cache(maxsize=4096)
+def _ref_col(ref: str) -> int:
+    col = 0
+    for ch in ref:
+        if ch.isdigit():
+            break
+        col = col * 26 + (ord(ch.upper()) - 64)
+    return col
+
+
+def _cast_number(value: str) -> Union[int, float]:
+    if "." in value or "E" in value or "e" in value:
+        return float(value)
+    return int(value)
+
+
+def _rels(archive: zipfile.ZipFile, part: str) -> Dict[str, Tuple[str, str]]:
+    """rId -> (type, absolute part name) for the relationships of part."""
+
+    folder, name = posixpath.split(part)
+    try:
+        root = ET.fromstring(archive.read(posixpath.join(folder, "_rels", name + ".rels")))
+    except KeyError:
+        return {}
+    out: Dict[str, Tuple[str, str]] = {}
+    for rel in root.iter(_PKG_REL_NS + "Relationship"):
+        target = rel.get("Target", "")
+        if rel.get("TargetMode") == "External":
+            continue
+        path = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join(folder, target))
+        out[rel.get("Id", "")] = (rel.get("Type", ""), path)
+    return out
+
+
+class ZipWorksheet:
+    def __init__(self, wb: "ZipWorkbook", part: str):
+        self._wb = wb
+        self._part = part
+
+    def iter_rows(
+        self, *, min_row: int, max_row: int, min_col: int, max_col: int, values_only: bool = False
+    ) -> Iterator[Tuple[Any, ...]]:
+        """Values of rows min_row..max_row (stops after the last row with data).
+
+        Only the cells inside [min_col, max_col] are decoded; parsing stops at
+        max_row, so the rest of the sheet XML is never read.
+        """
+
+        if not values_only:
+            raise UnsupportedXlsx("ZipWorksheet só lê valores (values_only=True)")
+
+        width = max_col - min_col + 1
+        empty = (None,) * width
+        cell_value = self._wb._cell_value
+        next_row = min_row
+        row_idx = 0
+        try:
+            with self._wb._archive.open(self._part) as src:
+                for _event, elem in ET.iterparse(src, events=("end",)):
+                    if elem.tag != _ROW:
+                        continue
+                    r = elem.get("r")
+                    row_idx = int(r) if r is not None else row_idx + 1
+                    if row_idx < min_row:
+                        elem.clear()
+                        continue
+                    if row_idx > max_row:
+                        break
+
+                    while next_row < row_idx:
+                        yield empty
+                        next_row += 1
+
+                    values: List[Any] = [None] * width
+                    col = 0
+                    for c in elem:
+                        ref = c.get("r")
+                        col = _ref_col(ref) if ref is not None else col + 1
+                        if min_col <= col <= max_col:
+                            values[col - min_col] = cell_value(c)
+                    elem.clear()
+                    yield tuple(values)
+                    next_row += 1
+        except (KeyError, ValueError, ET.ParseError, zipfile.BadZipFile) as exc:
+            raise UnsupportedXlsx(str(exc)) from exc
+
+
+class ZipWorkbook:
+    """Read-only view of an XLSX that parses sheet XML straight from the zip.
+
+    Quacks like an openpyxl read-only workbook for what the extractors use:
+    sheetnames, wb[name] and ws.iter_rows(..., values_only=True) with
+    data_only values. Shared strings and styles are parsed lazily, and shared
+    strings only as far as the highest index seen so far.
+    """
+
+    read_only = True
+
+    def __init__(self, source: Union[str, Path, bytes]):
+        if from_excel is None:  # pragma: no cover
+            raise UnsupportedXlsx("openpyxl não instalado")
+        try:
+            self._archive = zipfile.ZipFile(BytesIO(source) if isinstance(source, bytes) else source)
+            root_rels = _rels(self._archive, ".rels")
+            doc = next((p for t, p in root_rels.values() if t == _OFFICE_DOCUMENT_REL), "xl/workbook.xml")
+            root = ET.fromstring(self._archive.read(doc))
+        except (KeyError, OSError, ET.ParseError, zipfile.BadZipFile) as exc:
+            raise UnsupportedXlsx(str(exc)) from exc
+        if root.tag != _MAIN_NS + "workbook":
+            # e.g. Strict OOXML namespaces.
+            raise UnsupportedXlsx(f"Workbook não suportado: {root.tag}")
+
+        rels = _rels(self._archive, doc)
+        self._parts: Dict[str, str] = {}
+        self.sheetnames: List[str] = []
+        for sheet in root.iter(_MAIN_NS + "sheet"):
+            name = sheet.get("name", "")
+            self.sheetnames.append(name)
+            rel_type, part = rels.get(sheet.get(_DOC_REL_NS + "id", ""), ("", ""))
+            if rel_type == _WORKSHEET_REL:
+                self._parts[name] = part
+
+        pr = root.find(_MAIN_NS + "workbookPr")
+        date1904 = pr is not None and pr.get("date1904", "").lower() in ("1", "true")
+        self._epoch = CALENDAR_MAC_1904 if date1904 else CALENDAR_WINDOWS_1900
+        self._styles_part = next((p for t, p in rels.values() if t == _STYLES_REL), None)
+        self._strings_part = next((p for t, p in rels.values() if t == _SHARED_STRINGS_REL), None)
+
+        self._lock = threading.Lock()
+        self._date_formats: Optional[Set[int]] = None
+        self._timedelta_formats: Set[int] = set()
+        self._strings: List[str] = []
+        self._strings_iter: Optional[Iterator[Tuple[str, ET.Element]]] = None
+        # Kept open between lookups so the table is parsed only as far as needed.
+        self._strings_src: Optional[IO[bytes]] = None
+
+    def __getitem__(self, name: str) -> ZipWorksheet:
+        if name not in self.sheetnames:
+            raise KeyError(f"Worksheet {name} does not exist.")
+        part = self._parts.get(name)
+        if part is None:
+            raise UnsupportedXlsx(f"Aba {name!r} não é uma planilha de células")
+        return ZipWorksheet(self, part)
+
+    def _shared_string(self, idx: int) -> str:
+        strings = self._strings
+        if idx < len(strings):
+            return strings[idx]
+        with self._lock:
+            if self._strings_iter is None:
+                if self._strings_part is None:
+                    raise UnsupportedXlsx("sharedStrings ausente")
+                self._strings_src = self._archive.open(self._strings_part)
+                self._strings_iter = ET.iterparse(self._strings_src, events=("end",))
+            for _event, node in self._strings_iter:
+                if node.tag == _SI:
+                    strings.append(_rich_text(node).replace("x005F_", ""))
+                    node.clear()
+                    if idx < len(strings):
+                        break
+            else:
+                # Table fully read: release the member stream now.
+                self._close_strings()
+                self._strings_iter = iter(())
+            if idx >= len(strings):
+                raise UnsupportedXlsx(f"Índice de sharedStrings fora do intervalo: {idx}")
+        return strings[idx]
+
+    def _load_number_formats(self) -> Set[int]:
+        with self._lock:
+            if self._date_formats is not None:
+                return self._date_formats
+            date_formats: Set[int] = set()
+            if self._styles_part is not None:
+                root = ET.fromstring(self._archive.read(self._styles_part))
+                custom = {
+                    int(fmt.get("numFmtId", "0")): fmt.get("formatCode", "")
+                    for fmt in root.iterfind(f"{_MAIN_NS}numFmts/{_MAIN_NS}numFmt")
+                }
+                for idx, xf in enumerate(root.iterfind(f"{_MAIN_NS}cellXfs/{_MAIN_NS}xf")):
+                    num_fmt_id = int(xf.get("numFmtId", "0"))
+                    fmt = custom[num_fmt_id] if num_fmt_id in custom else builtin_format_code(num_fmt_id)
+                    if is_date_format(fmt):
+                        date_formats.add(idx)
+                    if is_timedelta_format(fmt):
+                        self._timedelta_formats.add(idx)
+            self._date_formats = date_formats
+            return date_formats
+
+    def _cell_value(self, c: ET.Element) -> Any:
+        t = c.get("t", "n")
+        if t == "inlineStr":
+            node = c.find(_IS)
+            return None if node is None else _rich_text(node)
+
+        v = c.findtext(_V) or None
+        if v is None:
+            return None
+        if t == "n":
+            value = _cast_number(v)
+            style = c.get("s")
+            if style:
+                date_formats = self._date_formats
+                if date_formats is None:
+                    date_formats = self._load_number_formats()
+                style_id = int(style)
+                if style_id in date_formats:
+                    try:
+                        return from_excel(value, self._epoch, timedelta=style_id in self._timedelta_formats)
+                    except (OverflowError, ValueError):
+                        return "#VALUE!"
+            return value
+        if t == "s":
+            return self._shared_string(int(v))
+        if t in ("str", "e"):
+            return v
+        if t == "b":
+            return bool(int(v))
+        if t == "d":
+            return from_ISO8601(v)
+        raise UnsupportedXlsx(f"Tipo de célula não suportado: {t!r}")
+
+    def _close_strings(self) -> None:
+        if self._strings_src is not None:
+            self._strings_src.close()
+            self._strings_src = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_strings()
+            self._strings_iter = None
+        self._archive.close()